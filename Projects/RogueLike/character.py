@@ -1,5 +1,8 @@
 import pygame
 import math
+import sharedPath
+from shared.transformCache import transforms
+from shared.hud import HudBar, HudCounter
 
 """
 Character
@@ -166,6 +169,15 @@ class Player(Character):
         
         self.attackAngle = 0
 
+        # Counts the swings so the melee hit detection knows when a new swing starts
+        # and every enemy can be hit again.
+        self.swingCount = 0
+
+        # (blade angle last frame, blade angle this frame) of the swing, or None on frames
+        # without an attack. The game sweeps the blade between the two for hits.
+        self.swingAngles = None
+        self.lastSwingAngle = 0
+
         self.maxHealth = 100
         self.currentHealth = self.maxHealth
 
@@ -176,6 +188,12 @@ class Player(Character):
         self.invulernableTimer = 0
         self.invulernableDuration = 1000
 
+        # The health bar and the health number are widgets on the game's HUD so they are
+        # only redrawn when the player's health changes.
+        barPos = (10,10)
+        self.healthBar = self.game.hud.add(HudBar(barPos, (100, 10), color=(0,255,0), back=(255,0,0), border=2, borderColor=(40,40,40)))
+        self.hpDisplay = self.game.hud.add(HudCounter((barPos[0] + 110, barPos[1] + 2), '{}/{}', size=20))
+
     def takeDamage(self, amount):
         
         # Player will take damage then gain invulernable frames for a short period.
@@ -229,8 +247,14 @@ class Player(Character):
             # Deletes the trails of the slash attack.
             self.slashTrail.clear()
 
+            # The blade starts pulled back by half of the 90 degree swing.
+            self.swingCount += 1
+            self.lastSwingAngle = self.attackAngle - math.pi / 4
+
     def updateAttack(self):
 
+        self.swingAngles = None
+
         if self.cooldownCounter > 0:
             self.cooldownCounter -= 1
 
@@ -257,6 +281,10 @@ class Player(Character):
                 self.attackAngle - (swingArc / 2)  + (swingArc * swingProgress)
             )
 
+            # The part of the arc the blade moved through this frame, used for hit detection.
+            self.swingAngles = (self.lastSwingAngle, currentAngle)
+            self.lastSwingAngle = currentAngle
+
             # offsets are for where the hitboxs should be located during the swing attack
             # which changes dynamically.
             offsetX = math.cos(currentAngle) * self.attackRadius
@@ -326,34 +354,11 @@ class Player(Character):
             self.flip = True
 
 
-    def renderHealthBar(self, surface, offset=(0,0)):
-        barPos = (10,10)
-
-        # The order of the rendering matters because it determines what is overlayed ontop.
-        # There is a slight offset to the bar position for the health bar red and the 
-        # the health bar borders because the borders should be visable not overlayed.
-        surface.blit(self.game.assets['healthBarBorder'], barPos)     
-        surface.blit(self.game.assets['redHealthBar'], (barPos[0] + 2, barPos[1] + 2))   
-        
-        # Calculates the width of the health bar based on current health.
-        healthBarPercentage = self.currentHealth/ self.maxHealth
-        healthBarWidth = int(100 * healthBarPercentage)
-
-        # The green health bar will be rendered as long the health is not zero.
-        if healthBarWidth > 0:
-
-            # Creating a subsurface so it can create a shrinking and enlarging effect of the health bar.
-            # .subsurface((x-pos, y-pos, width, height))
-            greenHealthBar = self.game.assets['greenHealthBar'].subsurface((0,0, healthBarWidth, 10))
-            surface.blit(greenHealthBar, (barPos[0] + 2, barPos[1] + 2))
-
-        # Number of health display.
-        if pygame.font.get_init():  
-            font = pygame.font.Font(None,20)
-            healthNum = f"{int(self.currentHealth)}/{self.maxHealth}"
-            hpDisplay = font.render(healthNum, True, (255,255,255))
-            hpPos = (barPos[0] + 110, barPos[1] + 2)
-            surface.blit(hpDisplay, hpPos)
+    def updateHealthBar(self):
+        # Hands the current health to the HUD widgets. The HUD overlay is only
+        # redrawn when the bar width or the number actually changes.
+        self.healthBar.set(self.currentHealth, self.maxHealth)
+        self.hpDisplay.set(int(self.currentHealth), self.maxHealth)
 
     def render(self, surface, offset=(0,0)):
         # Call the parent (Character) class's render method to draw the player sprite
@@ -395,10 +400,12 @@ class Player(Character):
                 # Also need to account for a flipped player where the slash will be rotated to the left horizontally. 
                 # Have to use negative angle for none flipped player because pygame's rotation is backwards. 
                 # Positive angles go clockwise in Pygame while normally in math positive angles go counterclockwise
+                # The rotated slashes come from the shared transform cache since the same
+                # slash image is drawn at the same angles every frame of the attack.
                 if self.attackFlip:
-                    rotatedSlash = pygame.transform.rotate(slashImg, angle + 180)
+                    rotatedSlash = transforms.rotate(slashImg, angle + 180)
                 else:
-                    rotatedSlash = pygame.transform.rotate(slashImg, -angle)
+                    rotatedSlash = transforms.rotate(slashImg, -angle)
 
                 # Adjust the positioning of the slashes based on the rotation or else there 
                 # will be inconsistent slash lengths based on different rotated slashes.
@@ -424,6 +431,16 @@ class Enemy(Character):
         self.attackTimer = 0
         self.speed = 1
 
+    # Puts a pooled enemy back to how a new enemy starts out at pos.
+    def reset(self, pos):
+        self.pos[0] = pos[0]
+        self.pos[1] = pos[1]
+        self.velocity[0] = 0
+        self.velocity[1] = 0
+        self.currentHealth = self.maxHealth
+        self.attackTimer = 0
+        self.flip = False
+
     def takeDamage(self, amount):
 
         # Updates the current health according to the damaged taken 
@@ -438,21 +455,35 @@ class Enemy(Character):
         
         return False
 
+    # Called by the game for the enemies its spatial hash finds in range of the player, so
+    # every enemy doesn't have to work out its own distance to the player each frame.
+    def attackPlayer(self, player):
+        if self.attackTimer <= 0:
+            player.takeDamage(self.damage)
+            self.attackTimer = self.attackCooldown
+
     def update(self, tilemap, player):
-        # Calculating distance between enemy and player so 
-        # the enemy can pursue the player.
-        dx = player.pos[0] - self.pos[0]
-        dy = player.pos[1] - self.pos[1]
+        movement = [0,0]
 
-        distance = math.sqrt(dx * dx + dy * dy)
+        # Follows the flow field so the enemy walks around walls instead of into them.
+        # Next to the player, or outside the field, it heads straight for the player.
+        direction = self.game.flowField.direction(self.rect().center)
+        if direction is not None:
+            movement = list(direction)
+        else:
+            # Calculating distance between enemy and player so 
+            # the enemy can pursue the player.
+            dx = player.pos[0] - self.pos[0]
+            dy = player.pos[1] - self.pos[1]
 
-        movement = [0,0]
+            distance = math.sqrt(dx * dx + dy * dy)
 
-        # Have the divide by distance or the 
-        # diagonal movement of the enemy will be faster then
-        # horizontal and vertical movement.
-        movement[0] = dx / distance
-        movement[1] = dy / distance
+            if distance > 0:
+                # Have the divide by distance or the 
+                # diagonal movement of the enemy will be faster then
+                # horizontal and vertical movement.
+                movement[0] = dx / distance
+                movement[1] = dy / distance
 
 
         if movement[0] > 0:
@@ -461,12 +492,6 @@ class Enemy(Character):
             self.flip = True
 
 
-        # The enemy attacks the player only when in range
-        # to prevent enemy from attack across the map.
-        if distance < 30 and self.attackTimer <= 0:
-            player.takeDamage(self.damage)
-            self.attackTimer = self.attackCooldown
-
         if self.attackTimer > 0:
             self.attackTimer -= 1
 
@@ -477,10 +502,9 @@ class Enemy(Character):
 
     def render(self, surface, offset=(0,0)):
 
-        enemyImg = self.game.assets['enemy']
         # Flips the enemy sprite if the enemy is moving left.
-        if self.flip:
-            pygame.transform.flip(self.game.assets['enemy'], True, False)
+        # The flipped sprite was previously computed and thrown away, so enemies never faced left.
+        enemyImg = transforms.flip(self.game.assets['enemy'], self.flip)
 
         surface.blit(enemyImg, (self.pos[0] - offset[0], self.pos[1] - offset[1]))
         
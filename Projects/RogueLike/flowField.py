@@ -0,0 +1,133 @@
+import math
+from collections import deque
+from tilemap import PHYSICS_TILES
+
+# How many tiles the field reaches from the player's tile in each direction. It covers
+# the enemy spawn ring (up to 250 pixels away) with room to walk around walls.
+FLOW_FIELD_RADIUS = 24
+
+# The eight steps to a neighbouring tile. Straight steps come first so ties prefer them.
+FLOW_STEPS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+"""
+FlowField
+
+Description:
+    Pathfinding shared by every enemy. A breadth first search runs out from the player's tile
+    over the walkable tiles (anything that is not a physics tile) and records, for every tile
+    it reaches, the neighbouring tile one step closer to the player. The search only runs
+    again when the player moves onto a different tile, and each enemy then looks up the tile
+    it is standing on to get its direction in constant time, so hundreds of enemies cost one
+    search. Diagonal steps are only taken when both tiles beside the diagonal are walkable so
+    enemies don't try to squeeze through wall corners.
+
+Public Methods:
+    - reset()                       Rebuilds the set of solid tiles after a map is loaded.
+    - update(pos)                   Recomputes the field if pos is on a different tile than last time.
+    - direction(pos)                Returns the unit direction to walk from pos, or None.
+
+Usage:
+    - self.flowField = FlowField(self.tilemap)
+    - self.flowField.update(self.player.rect().center)
+    - direction = self.flowField.direction(enemy.rect().center)
+"""
+
+class FlowField:
+    def __init__(self, tilemap, radius=FLOW_FIELD_RADIUS):
+        self.tilemap = tilemap
+        self.radius = radius
+
+        # Grid positions of the tiles characters collide with.
+        self.solid = set()
+
+        # The field covers a square window of tiles around its origin, stored flat with a one
+        # tile border that is always blocked so the search never has to check the bounds.
+        # next[i] is the index of the tile one step closer to the origin, or -1 if the search
+        # never reached tile i.
+        self.size = 2 * radius + 3
+        self.origin = None
+        self.next = []
+
+        self.reset()
+
+    def reset(self):
+        self.solid = {(int(tile['pos'][0]), int(tile['pos'][1])) for tile in self.tilemap.tilemap.values() if tile['type'] in PHYSICS_TILES}
+        self.origin = None
+        self.next = []
+
+    # Args:
+    #   pos (tuple): The (x, y) pixel position the enemies should walk to, usually the player's center.
+    # Returns:
+    #   True if the field was recomputed, False if pos is still on the same tile.
+    def update(self, pos):
+        tileSize = self.tilemap.tileSize
+        origin = (int(pos[0] // tileSize), int(pos[1] // tileSize))
+        if origin == self.origin:
+            return False
+
+        self.origin = origin
+        size = self.size
+        radius = self.radius
+
+        # Walls and the border of the window can't be walked through.
+        blocked = bytearray(size * size)
+        for i in range(size):
+            blocked[i] = blocked[(size - 1) * size + i] = 1
+            blocked[i * size] = blocked[i * size + size - 1] = 1
+        left = origin[0] - radius - 1
+        top = origin[1] - radius - 1
+        for x, y in self.solid:
+            if 0 <= x - left < size and 0 <= y - top < size:
+                blocked[(y - top) * size + x - left] = 1
+
+        # Each step as an index offset, with the offsets of the two straight steps beside it.
+        steps = [(stepY * size + stepX, stepX, stepY * size) for stepX, stepY in FLOW_STEPS]
+
+        start = (radius + 1) * size + radius + 1
+        nextTile = [-1] * (size * size)
+        nextTile[start] = start
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            for step, stepX, stepY in steps:
+                neighbour = i + step
+                if nextTile[neighbour] != -1 or blocked[neighbour]:
+                    continue
+                if stepX and stepY and (blocked[i + stepX] or blocked[i + stepY]):
+                    continue
+                nextTile[neighbour] = i
+                queue.append(neighbour)
+
+        self.next = nextTile
+        return True
+
+    # Args:
+    #   pos (tuple): The (x, y) pixel position of an enemy, usually its center.
+    # Returns:
+    #   A unit (dx, dy) vector towards the center of the next tile on the way to the field's
+    #   origin, or None when pos is on the origin tile, outside the field, or in a wall.
+    def direction(self, pos):
+        if self.origin is None:
+            return None
+
+        tileSize = self.tilemap.tileSize
+        size = self.size
+        left = self.origin[0] - self.radius - 1
+        top = self.origin[1] - self.radius - 1
+        x = int(pos[0] // tileSize) - left
+        y = int(pos[1] // tileSize) - top
+        if not (0 <= x < size and 0 <= y < size):
+            return None
+
+        i = y * size + x
+        target = self.next[i]
+        if target == -1 or target == i:
+            return None
+
+        dx = (left + target % size + 0.5) * tileSize - pos[0]
+        dy = (top + target // size + 0.5) * tileSize - pos[1]
+        distance = math.hypot(dx, dy)
+        if distance == 0:
+            return None
+        return (dx / distance, dy / distance)
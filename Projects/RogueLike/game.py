@@ -1,8 +1,15 @@
+import os
 import sys
 import pygame
 from utils import loadImage, loadImages
 from character import Character, Player, Enemy
 from tilemap import Tilemap
+import sharedPath
+from shared.spatialHash import SpatialHash
+from shared.hud import Hud, HudCounter
+from melee import MeleeHits
+from flowField import FlowField
+from waves import WAVE_CURVES, WaveDirector, EnemyPool, SpawnRing
 import random
 import math
 
@@ -66,18 +73,12 @@ class Game:
             'player': pygame.transform.scale(loadImage('Player/slashCharacter.png'), (16, 20)),  # Adjust the size to match the tiles
             'slashRight':pygame.transform.scale(loadImage('slashAttack/slashRight.png').convert_alpha(), (16,20)),
             'slashLeft':pygame.transform.scale(loadImage('slashAttack/slashLeft.png').convert_alpha(), (16,20)),
-            'healthBarBorder':pygame.Surface((104,14)),
-            'redHealthBar':pygame.Surface((100,10)),
-            'greenHealthBar':pygame.Surface((100,10)),
             'enemy': pygame.transform.scale(loadImage('Enemy/enemy2.png'), (16,20)),
             
         }
 
-        # Sets up the health bar to have a dark gray border
-        self.assets['healthBarBorder'].fill((40,40,40))
-        # Fills the rectangle surface with red and the other one with green.
-        self.assets['redHealthBar'].fill((255,0,0))
-        self.assets['greenHealthBar'].fill((0,255,0))
+        # Retained HUD layer drawn over the game. The player adds its health widgets to it.
+        self.hud = Hud()
 
         # Creating a player
         # Pass in a game, name, position and size
@@ -86,70 +87,119 @@ class Game:
         # Creating a tilemap object with the specified tile size
         self.tilemap = Tilemap(self, tileSize=16)
 
+        # Shared pathfinding towards the player for every enemy, rebuilt when a map loads.
+        self.flowField = FlowField(self.tilemap)
+
         # Loads the first map of the game.
         self.loadMap(0)
 
         
         # Setting up enmey spawning.
         self.enemies = []
-        self.enemyTimer = 0
-        self.enemySpawnDelay = 180
+
+        # Broadphase grid the enemies are registered in every frame so hitboxes
+        # only have to be tested against the enemies near them.
+        self.enemyGrid = SpatialHash()
+
+        # Hit detection for the player's slash against the enemies in the grid.
+        self.melee = MeleeHits()
+
+        # Waves of enemies follow a wave curve from waves.py. Swap in WAVE_CURVES['stress']
+        # to ramp up to several hundred enemies.
+        self.waveDirector = WaveDirector(WAVE_CURVES['default'])
+        self.maxEnemy = self.waveDirector.maxEnemy
+
+        # Every enemy the wave curve can have alive at once is made up front and reused.
+        self.enemyPool = EnemyPool(self, (16,20), self.waveDirector.peak())
+
+        # Tiles between 150 and 250 pixels from the player that enemies can spawn on.
         self.minSpawnDistance = 150
         self.maxSpawnDistance = 250
-        self.maxEnemy = 5
+        self.spawnRing = SpawnRing(self.tilemap.tileSize, self.minSpawnDistance, self.maxSpawnDistance)
+
+        # Distance in pixels from the player's center to the edge of an enemy that can hit them.
+        # About the same reach as the old check of 30 pixels between the two top left corners.
+        self.enemyAttackRange = 20
+
+        self.waveCounter = self.hud.add(HudCounter((10, 26), 'wave {}  enemies {}', size=20))
 
 
     def spawnEnemy(self):
 
         # Do not spawn anymore enemies if reached max enmey count
-        if len(self.enemies) > self.maxEnemy:
+        if len(self.enemies) >= self.maxEnemy:
             return
-        
 
-        # Randomly generates an angle of position for the 
-        # enemy to spawn around the player.
-        angle = random.uniform(0, 2 * math.pi)
-        distance = random.uniform(self.minSpawnDistance, self.maxSpawnDistance)
-
-        spawnX = self.player.rect().centerx + math.cos(angle) * distance
-        spawnY = self.player.rect().centery + math.sin(angle) * distance
+        # Picks a random tile in the ring around the player that isn't a wall.
+        pos = self.spawnRing.choose()
+        if pos is None:
+            return
 
-        newEnemy = Enemy(self, (spawnX, spawnY), (16,20))
-        self.enemies.append(newEnemy)
+        self.enemies.append(self.enemyPool.acquire(pos))
 
     def updateEnemy(self):
 
-        # Delays the spawning of enemies so there are not too many
-        # of them at once.
-        self.enemyTimer += 1
-        if self.enemyTimer > self.enemySpawnDelay:
+        # Recomputes the paths to the player only when they moved onto a new tile,
+        # and the spawn tiles around them along with it.
+        if self.flowField.update(self.player.rect().center):
+            self.spawnRing.update(self.flowField)
+
+        # The wave director spaces out the spawns so there are not too many
+        # enemies at once.
+        spawnCount = self.waveDirector.update()
+        self.maxEnemy = self.waveDirector.maxEnemy
+        for i in range(spawnCount):
             self.spawnEnemy()
-            self.enemyTimer = 0
-
-        # [:] creates a temporary copy of the enemies list to 
-        # iterate over the copied list because if you iterate over the 
-        # original enemy while deleting elements in the list
-        # this could cause problems since the list's length is 
-        # changing with each iteration.
-        for enemy in self.enemies[:]:
-            enemy.update(self.tilemap, self.player)
-            
-            enemyRect = enemy.rect()
-            slashRightRect = self.assets['slashRight'].get_rect()
-            slashLeftRect = self.assets['slashLeft'].get_rect()
-            
-            if enemyRect.colliderect(slashRightRect) or enemyRect.colliderect(slashLeftRect):
-                enemy.takeDamage(25)
 
-            # Removes enemy from the map and game if their health hits zero.
+        # Moves every enemy and registers where it ended up in the grid.
+        self.enemyGrid.clear()
+        for enemy in self.enemies:
+            enemy.update(self.tilemap, self.player)
+            self.enemyGrid.insert(enemy, enemy.rect())
+
+        # The enemies attack the player only when in range to prevent them from attacking
+        # across the map. The grid finds the enemies whose rect is within range of the
+        # player's center instead of every enemy measuring its distance to the player.
+        for enemy in self.enemyGrid.queryRadius(self.player.rect().center, self.enemyAttackRange):
+            enemy.attackPlayer(self.player)
+
+        # Sweeps the slash blade along the arc it moved through this frame. The blade swings
+        # around the player's center at attackRadius, the same place the slash images are drawn.
+        # Each enemy can only be hit once per swing.
+        if self.player.swingAngles is not None:
+            center = (self.player.pos[0] + self.player.size[0] / 2, self.player.pos[1] + self.player.size[1] / 2)
+            startAngle, endAngle = self.player.swingAngles
+            for enemy in self.melee.sweep(self.player.swingCount, center, self.player.attackRadius, startAngle, endAngle, self.enemyGrid):
+                enemy.takeDamage(self.player.attackDmg)
+
+        # Removes enemies whose health hit zero and gives them back to the pool. The
+        # living enemies are moved down over the dead ones in one pass and the end of the
+        # list is cut off, instead of remove() searching and shifting the list per enemy.
+        alive = 0
+        for enemy in self.enemies:
             if enemy.currentHealth <= 0:
-                self.enemies.remove(enemy)
+                self.enemyPool.release(enemy)
+            else:
+                self.enemies[alive] = enemy
+                alive += 1
+        del self.enemies[alive:]
+
+        self.waveCounter.set(self.waveDirector.wave + 1, len(self.enemies))
 
 
     def loadMap(self, path):
 
         print('Successful map load')
-        self.tilemap.load('Media/levels/' + str(path) + '.json')
+        # Prefers the packed binary version of the level when one has been converted, unless
+        # the JSON was edited after the conversion so an old .lvl never hides a change.
+        levelPath = 'Media/levels/' + str(path)
+        packedPath = levelPath + '.lvl'
+        jsonPath = levelPath + '.json'
+        if os.path.exists(packedPath) and (not os.path.exists(jsonPath) or os.path.getmtime(packedPath) >= os.path.getmtime(jsonPath)):
+            self.tilemap.load(packedPath)
+        else:
+            self.tilemap.load(jsonPath)
+        self.flowField.reset()
         
     def run(self):
         while True:
@@ -170,8 +220,8 @@ class Game:
             self.player.update(self.tilemap, (self.movement[1] - self.movement[0], self.movement[3] - self.movement[2]))
             self.player.render(self.display, offset=renderScroll)
             
-            # Displays and updates the health bar.
-            self.player.renderHealthBar(self.display, renderScroll)
+            # Updates the health bar widgets on the HUD.
+            self.player.updateHealthBar()
 
             self.updateEnemy()
 
@@ -179,6 +229,9 @@ class Game:
 
             for enemy in self.enemies:
                 enemy.render(self.display, offset=renderScroll)
+
+            # The HUD is drawn last so it stays on top of the characters.
+            self.hud.render(self.display)
             # Checks for user input
             for event in pygame.event.get():
 
@@ -2,6 +2,8 @@ import sys
 import pygame
 from utils import loadImages
 from tilemap import Tilemap
+import sharedPath
+from shared.dirtyRects import DirtyRects
 
 
 # This is how much the images are being scaled up by to the window. 
@@ -14,7 +16,10 @@ RENDERSCALE = 2.000
 class LevelEditor:
 
     # Sets up the game windows, framerate, player, and other assets
-    def __init__(self):
+    # Args:
+    #   dirtyRects (bool): Redraw only the parts of the window that changed each frame
+    #                      instead of the whole window.
+    def __init__(self, dirtyRects=True):
 
         # Starts up Pygame
         pygame.init()
@@ -84,13 +89,44 @@ class LevelEditor:
         # item in self.assets or the variant of the tiles in the 
         # self.assetTypes
         self.indexVariant = 0
-        
+
+        # Dirty rect rendering. The last camera position, hover tile rect and selected
+        # tile are remembered so the editor can tell which parts of the window changed.
+        self.dirtyRects = dirtyRects
+        self.dirty = DirtyRects(self.display, self.screen)
+        self.lastScroll = None
+        self.lastPreview = None
+        self.lastSelected = None
+
+    # Marks the window area of a tile so it is redrawn.
+    #
+    # Args:
+    #   tile (dict): A tile dictionary, on grid when onGrid is True and off grid otherwise.
+    #   onGrid (bool): Whether the tile's 'pos' is in tiles or in pixels.
+    def markTile(self, tile, onGrid):
+        img = self.assets[tile['type']][tile['variant']]
+        scale = self.tilemap.tileSize if onGrid else 1
+        # The extra pixel covers off grid tiles whose float position rounds either way.
+        self.dirty.mark((tile['pos'][0] * scale - self.scroll[0], tile['pos'][1] * scale - self.scroll[1], img.get_width() + 1, img.get_height() + 1))
+
+    # Redraws one dirty region of the display.
+    #
+    # Args:
+    #   region (pygame.Rect): The area of the display to redraw.
+    #   renderScroll (tuple): The camera offset.
+    #   currentTileImg (pygame.Surface): The semi-transparent hover tile.
+    #   previewPos (tuple): Where the hover tile is drawn.
+    def drawRegion(self, region, renderScroll, currentTileImg, previewPos):
+        # Clipping the display makes every blit outside of the region a no-op.
+        self.display.set_clip(region)
+        self.display.fill((0,0,0))
+        self.tilemap.render(self.display, offset=renderScroll)
+        self.display.blit(currentTileImg, previewPos)
+        self.display.set_clip(None)
+
     def run(self):
         while True:
 
-            # Sets the background to an image at the position (0,0)
-            self.display.fill((0,0,0))
-
             # Allows the camera to be moved with the WASD or arrow keys
             # which is important when wanting to create levels that go beyond the base
             # window size.
@@ -104,7 +140,11 @@ class LevelEditor:
             # Displays the tilemap onto the level editor with the camera offset.
             # The camera offset is needed to move the camera posiiton in the level editor. 
             renderScroll = ( int(self.scroll[0]), int(self.scroll[1]) )
-            self.tilemap.render(self.display,offset=renderScroll)
+
+            # Moving the camera moves everything on the window so the whole display is redrawn.
+            if renderScroll != self.lastScroll or not self.dirtyRects:
+                self.dirty.markAll()
+                self.lastScroll = renderScroll
 
             # Retrieves the current tile image from the assets dictionary using the type and variant indices,
             # and creates a copy of it to avoid modifying the original image.
@@ -136,15 +176,34 @@ class LevelEditor:
                 # tilePos is already aligned with the grid while the mousePos is not. 
                 # Have to reconvert the tilePos back to pixals and account for any camera offset that will
                 # make the tile placements off once the camera is moved.
-                self.display.blit(currentTileImg, (tilePos[0] * self.tilemap.tileSize - self.scroll[0], tilePos[1] * self.tilemap.tileSize - self.scroll[1]))
+                previewPos = (tilePos[0] * self.tilemap.tileSize - self.scroll[0], tilePos[1] * self.tilemap.tileSize - self.scroll[1])
             
             else:
                 # Displays the current image tile on the offgrid which the mouse position is in. 
-                self.display.blit(currentTileImg, mousePos)
+                previewPos = mousePos
+
+            # The hover tile is redrawn where it was and where it is now whenever the mouse
+            # moves or a different tile is selected.
+            preview = pygame.Rect(previewPos, currentTileImg.get_size()).inflate(2, 2)
+            selected = (self.indexType, self.indexVariant)
+            if preview != self.lastPreview or selected != self.lastSelected:
+                if self.lastPreview is not None:
+                    self.dirty.mark(self.lastPreview)
+                self.dirty.mark(preview)
+                self.lastPreview = preview
+                self.lastSelected = selected
             
             # Once the player left clicks then that tile is placed down onto the screen and the tilemap and places on the grid.
+            # The tile is only replaced (and redrawn) when it is different from the one already there.
             if self.leftClicking and self.onGrid:
-                self.tilemap.tilemap[str(tilePos[0]) + ';' + str(tilePos[1])] = {'type': self.assetTypes[self.indexType], 'variant': self.indexVariant, 'pos': tilePos}
+                tile = {'type': self.assetTypes[self.indexType], 'variant': self.indexVariant, 'pos': tilePos}
+                tileLoc = str(tilePos[0]) + ';' + str(tilePos[1])
+                oldTile = self.tilemap.tilemap.get(tileLoc)
+                if oldTile is None or oldTile['type'] != tile['type'] or oldTile['variant'] != tile['variant']:
+                    if oldTile is not None:
+                        self.markTile(oldTile, True)
+                    self.tilemap.tilemap[tileLoc] = tile
+                    self.markTile(tile, True)
 
             # If the user right clicks and there exists a tile there, 
             # delete that tile off the screen and the tilemap. 
@@ -153,21 +212,14 @@ class LevelEditor:
             if self.rightClicking:
                 tileLoc = str(tilePos[0]) + ';' + str(tilePos[1])
                 if tileLoc in self.tilemap.tilemap:
+                    self.markTile(self.tilemap.tilemap[tileLoc], True)
                     del self.tilemap.tilemap[tileLoc]
                 
-                # A copy is made of the off grid tiles because the offgrid tile that is touching the right clicked mouse is getting 
-                # deleted.
-                for tile in self.tilemap.offgridTiles.copy():
-                    # Need to get the image of the off grid tiles because 
-                    # some of the aseets will be larger then others and this will influence how 
-                    # the off grid tile deletion works.
-                    tileImg = self.assets[tile['type']][tile['variant']]
-
-                    # Makes the off grid tile image a pygame rectangle for collision detection.
-                    tileRect = pygame.Rect(tile['pos'][0] - self.scroll[0], tile['pos'][1] - self.scroll[1], tileImg.get_width(), tileImg.get_height())
-                    # Checks if the off grid tile is colliding with the mouse. 
-                    if tileRect.collidepoint(mousePos):
-                        self.tilemap.offgridTiles.remove(tile)
+                # Deletes the off grid tiles touching the right clicked mouse. 
+                # The mouse position is moved into world space with the camera scroll 
+                # so the spatial index only has to check the tiles near the mouse.
+                for tile in self.tilemap.removeOffgridTilesAt((mousePos[0] + self.scroll[0], mousePos[1] + self.scroll[1])):
+                    self.markTile(tile, False)
 
             # Checks for user input
             for event in pygame.event.get():
@@ -190,7 +242,9 @@ class LevelEditor:
                         self.leftClicking = True
                         # If the on grid is not toggled, then place the tiles off the grid.
                         if not self.onGrid:
-                            self.tilemap.offgridTiles.append({'type':self.assetTypes[self.indexType], 'variant': self.indexVariant, 'pos': (mousePos[0] + self.scroll[0], mousePos[1] + self.scroll[1])})
+                            tile = {'type':self.assetTypes[self.indexType], 'variant': self.indexVariant, 'pos': (mousePos[0] + self.scroll[0], mousePos[1] + self.scroll[1])}
+                            self.tilemap.addOffgridTile(tile)
+                            self.markTile(tile, False)
                     if event.button == 3:
                         self.rightClicking = True
 
@@ -342,14 +396,14 @@ class LevelEditor:
                         self.movement[3] = False
             
             
-            # .blit() draws whatever object on the window
-            # in this case screen is the main game window
-            # .blit( [Object want to draw on window], (x - position of object on window, y - position of object on window) ) 
-            # pygame.transform.scale() makes the screen zoom closer to the player
-            self.screen.blit(pygame.transform.scale(self.display, self.screen.get_size()), (0, 0))
-
+            # Redraws the parts of the display that changed, then scales only those parts up
+            # onto the window and updates them. Nothing is drawn when nothing changed.
+            if self.dirty:
+                regions = self.dirty.regions()
+                for region in regions:
+                    self.drawRegion(region, renderScroll, currentTileImg, previewPos)
+                self.dirty.present(regions)
 
-            pygame.display.update()
             self.clock.tick(60)
 
 LevelEditor().run()
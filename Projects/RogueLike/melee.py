@@ -0,0 +1,138 @@
+import math
+
+# Radius in pixels of the slash blade, about half of the 16x20 slash image.
+SLASH_HIT_RADIUS = 10
+
+# Longest arc, in radians, covered by one straight capsule. Longer sweeps are split so the
+# chords stay within a fraction of a pixel of the real arc.
+MAX_SEGMENT_ARC = math.pi / 18
+
+
+# Args:
+#   point (tuple): An (x, y) position.
+#   rect (pygame.Rect): A rectangle.
+# Returns:
+#   The distance from the point to the closest point of the rectangle, 0 when inside.
+def pointRectDistance(point, rect):
+    dx = max(rect.left - point[0], 0, point[0] - rect.right)
+    dy = max(rect.top - point[1], 0, point[1] - rect.bottom)
+    return math.hypot(dx, dy)
+
+
+# Args:
+#   point (tuple): An (x, y) position.
+#   a, b (tuple): The end points of a line segment.
+# Returns:
+#   The distance from the point to the closest point of the segment.
+def pointSegmentDistance(point, a, b):
+    abx, aby = b[0] - a[0], b[1] - a[1]
+    lengthSquared = abx * abx + aby * aby
+    t = 0
+    if lengthSquared:
+        t = max(0, min(1, ((point[0] - a[0]) * abx + (point[1] - a[1]) * aby) / lengthSquared))
+    return math.hypot(point[0] - (a[0] + abx * t), point[1] - (a[1] + aby * t))
+
+
+# Args:
+#   a, b (tuple): The end points of a line segment.
+#   rect (pygame.Rect): A rectangle.
+# Returns:
+#   True if the segment passes through the rectangle. Rect.clipline rounds the points to
+#   integers, so the segment is clipped against each edge here instead (Liang-Barsky).
+def segmentCrossesRect(a, b, rect):
+    dx = b[0] - a[0]
+    dy = b[1] - a[1]
+    start, end = 0, 1
+    for p, q in ((-dx, a[0] - rect.left), (dx, rect.right - a[0]), (-dy, a[1] - rect.top), (dy, rect.bottom - a[1])):
+        if p == 0:
+            # Parallel to this edge, so the segment has to already be on the inside of it.
+            if q < 0:
+                return False
+        elif p < 0:
+            start = max(start, q / p)
+        else:
+            end = min(end, q / p)
+        if start > end:
+            return False
+    return True
+
+
+# Args:
+#   a, b (tuple): The end points of a line segment.
+#   rect (pygame.Rect): A rectangle.
+# Returns:
+#   The distance between the segment and the rectangle, 0 when they touch. When they don't
+#   touch the closest pair of points always has an end point of the segment or a corner
+#   of the rectangle in it.
+def segmentRectDistance(a, b, rect):
+    if segmentCrossesRect(a, b, rect):
+        return 0
+    corners = (rect.topleft, rect.topright, rect.bottomleft, rect.bottomright)
+    return min(pointRectDistance(a, rect), pointRectDistance(b, rect),
+               min(pointSegmentDistance(corner, a, b) for corner in corners))
+
+
+"""
+MeleeHits
+
+Description:
+    Hit detection for the player's slash. Each frame of a swing the blade moves along an arc
+    around the player; the arc swept since the previous frame is turned into a chain of
+    capsules (line segments with the blade's radius), so fast swings can't pass over an enemy
+    between two frames. Only the enemies the spatial hash returns for the bounding box of the
+    capsules are tested, and every enemy is hit at most once per swing.
+
+Public Methods:
+    - sweep(swing, center, reach, startAngle, endAngle, grid)   Returns the enemies newly hit by the swept arc.
+
+Usage:
+    - self.melee = MeleeHits()
+    - for enemy in self.melee.sweep(player.swingCount, center, 40, a0, a1, self.enemyGrid):
+          enemy.takeDamage(player.attackDmg)
+"""
+
+class MeleeHits:
+    def __init__(self, hitRadius=SLASH_HIT_RADIUS):
+        self.hitRadius = hitRadius
+
+        # The swing the hit set belongs to and the enemies it has already hit.
+        self.swing = None
+        self.hit = set()
+
+    # Args:
+    #   swing: Any value identifying the current swing. A new value starts a new hit set.
+    #   center (tuple): The (x, y) point the blade swings around.
+    #   reach (float): Distance from the center to the blade.
+    #   startAngle, endAngle (float): The blade's angle in radians last frame and this frame.
+    #   grid (SpatialHash): The broadphase the enemies are registered in.
+    # Returns:
+    #   A list of the enemies touched by the swept blade that were not hit earlier in this swing.
+    def sweep(self, swing, center, reach, startAngle, endAngle, grid):
+        if swing != self.swing:
+            self.swing = swing
+            self.hit.clear()
+
+        steps = max(1, math.ceil(abs(endAngle - startAngle) / MAX_SEGMENT_ARC))
+        points = []
+        for i in range(steps + 1):
+            angle = startAngle + (endAngle - startAngle) * i / steps
+            points.append((center[0] + math.cos(angle) * reach, center[1] + math.sin(angle) * reach))
+
+        # Broadphase with the bounding box of the whole swept blade.
+        radius = self.hitRadius
+        left = min(point[0] for point in points) - radius
+        top = min(point[1] for point in points) - radius
+        right = max(point[0] for point in points) + radius
+        bottom = max(point[1] for point in points) + radius
+
+        hits = []
+        for enemy in grid.query((left, top, right - left, bottom - top)):
+            if enemy in self.hit:
+                continue
+            rect = enemy.rect()
+            for a, b in zip(points, points[1:]):
+                if segmentRectDistance(a, b, rect) <= radius:
+                    self.hit.add(enemy)
+                    hits.append(enemy)
+                    break
+        return hits
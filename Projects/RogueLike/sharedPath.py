@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The modules the RogueLike shares with the platformer live in Projects/shared. Importing this
+# module puts the Projects folder on sys.path so `from shared.hud import Hud` works when the
+# game is run from the RogueLike folder.
+PROJECTS_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECTS_PATH not in sys.path:
+    sys.path.append(PROJECTS_PATH)
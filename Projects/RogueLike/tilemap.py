@@ -1,5 +1,8 @@
 import pygame
 import json
+import gc
+import sharedPath
+from shared import levelFormat
 import tkinter as tk
 from tkinter import filedialog # Needed for browsing files to load for level editor.
 
@@ -11,6 +14,122 @@ NEIGHBOR_OFFSETS = [(-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (0, 0), (-1, 1)
 # Tiles that will interact with physics (e.g., collision detection).
 PHYSICS_TILES = {'grass', 'stone'}
 
+# Size in pixels of the cells of the uniform grid used to look up off-grid tiles.
+OFFGRID_CELL_SIZE = 64
+
+
+"""
+OffgridIndex
+
+Description:
+    A spatial hash over the off-grid tiles of a tilemap. The world is split into square 
+    cells and every tile is stored in each cell its image covers, so rendering and the 
+    level editor only look at the tiles near the camera or the mouse instead of every 
+    off-grid tile in the level. Tiles are given increasing ids as they are added, so 
+    query results come back in the order the tiles were placed (their draw order).
+
+Public Methods:
+    - add(tile, size)                            Adds a tile dictionary whose image is size pixels big, returns its id.
+    - remove(tileId)                             Removes the tile with the given id and returns it.
+    - query(rect)                                Returns the ids of the tiles overlapping a pygame.Rect, in draw order.
+    - queryPoint(pos)                            Returns the ids of the tiles whose image covers a pixel position.
+
+Usage:
+    - index = OffgridIndex()
+    - tileId = index.add({'type': 'grass', 'variant': 0, 'pos': (40.5, 12)}, (16, 16))
+    - visible = [index.tiles[i] for i in index.query(cameraRect)]
+"""
+
+class OffgridIndex:
+    def __init__(self, cellSize=OFFGRID_CELL_SIZE):
+        self.cellSize = cellSize
+
+        # Cell coordinates -> list of ids of the tiles in that cell.
+        self.cells = {}
+
+        # Id -> tile dictionary, kept in the order the tiles were added.
+        self.tiles = {}
+
+        # Id -> (left, top, right, bottom) of the tile's image in pixels.
+        self.bounds = {}
+
+        self.nextId = 0
+
+    def __len__(self):
+        return len(self.tiles)
+
+    # Get the coordinates of every cell a box in pixels covers.
+    def cellsCovering(self, left, top, right, bottom):
+        for cx in range(int(left // self.cellSize), int(right // self.cellSize) + 1):
+            for cy in range(int(top // self.cellSize), int(bottom // self.cellSize) + 1):
+                yield (cx, cy)
+
+    # Add a tile to the index.
+    #
+    # Args:
+    #   tile (dict): The off-grid tile with its 'pos' in pixels.
+    #   size (tuple): The (width, height) of the tile's image.
+    #
+    # Returns:
+    #   The id of the tile, used to remove it later.
+    def add(self, tile, size):
+        tileId = self.nextId
+        self.nextId += 1
+
+        box = (tile['pos'][0], tile['pos'][1], tile['pos'][0] + size[0], tile['pos'][1] + size[1])
+        self.tiles[tileId] = tile
+        self.bounds[tileId] = box
+
+        for cell in self.cellsCovering(*box):
+            self.cells.setdefault(cell, []).append(tileId)
+
+        return tileId
+
+    # Remove a tile from the index and return it.
+    def remove(self, tileId):
+        tile = self.tiles.pop(tileId)
+
+        for cell in self.cellsCovering(*self.bounds.pop(tileId)):
+            self.cells[cell].remove(tileId)
+
+            # Empty cells are dropped so they do not pile up as tiles are deleted.
+            if not self.cells[cell]:
+                del self.cells[cell]
+
+        return tile
+
+    # Get the ids of the tiles overlapping a rectangle.
+    #
+    # Args:
+    #   rect (pygame.Rect): The area in pixels, e.g. the camera view.
+    #
+    # Returns:
+    #   A list of tile ids sorted in the order the tiles were added.
+    def query(self, rect):
+        found = set()
+        for cell in self.cellsCovering(rect.left, rect.top, rect.right, rect.bottom):
+            if cell in self.cells:
+                found.update(self.cells[cell])
+
+        matches = []
+        for tileId in found:
+            box = self.bounds[tileId]
+            if box[0] < rect.right and box[2] > rect.left and box[1] < rect.bottom and box[3] > rect.top:
+                matches.append(tileId)
+
+        matches.sort()
+        return matches
+
+    # Get the ids of the tiles whose image covers a position in pixels.
+    def queryPoint(self, pos):
+        matches = []
+        for tileId in self.cells.get((int(pos[0] // self.cellSize), int(pos[1] // self.cellSize)), ()):
+            box = self.bounds[tileId]
+            if box[0] <= pos[0] < box[2] and box[1] <= pos[1] < box[3]:
+                matches.append(tileId)
+
+        return matches
+
 
 """
 Tilemap
@@ -25,6 +144,9 @@ Public Methods:
                                                  tile size, and an empty tile dictionary.
     - tilesAround(pos)                           Retrieves a list of neighboring tiles around a given position.
     - physicsRectsAround(pos)                    Retrieves physics-enabled tiles as rectangles around a given position.
+    - addOffgridTile(tile)                       Adds an off-grid tile and keeps the spatial index in sync.
+    - removeOffgridTilesAt(pos)                  Deletes every off-grid tile whose image covers a pixel position.
+    - offgridTilesIn(rect)                       Retrieves the off-grid tiles overlapping a rectangle, in draw order.
     - render(surface, offset=(0, 0))             Renders both grid-aligned and off-grid tiles onto a surface, 
                                                  with support for camera offset.
 
@@ -56,8 +178,9 @@ class Tilemap:
         self.tilemap = {}
 
 
-        # A list to store off-grid tiles that do not align with the main grid.
-        self.offgridTiles = []
+        # A spatial index of the off-grid tiles that do not align with the main grid
+        # so only the ones near the camera have to be drawn.
+        self.offgridTiles = OffgridIndex()
 
 
         # Example of using tilemap system
@@ -89,6 +212,47 @@ class Tilemap:
 
         return tiles
 
+    # Add a tile that does not align with the grid.
+    #
+    # Args:
+    #   tile (dict): The tile with its 'pos' in pixels.
+    #
+    # Returns:
+    #   The id of the tile in the off-grid index.
+    def addOffgridTile(self, tile):
+        # The size of the tile's image decides which cells of the index it covers.
+        # Tiles without a loaded image are treated as one tile big.
+        if tile['type'] in self.game.assets:
+            size = self.game.assets[tile['type']][tile['variant']].get_size()
+        else:
+            size = (self.tileSize, self.tileSize)
+
+        return self.offgridTiles.add(tile, size)
+
+    # Delete every off-grid tile whose image covers the given position.
+    #
+    # Args:
+    #   pos (tuple): The (x, y) position in pixels.
+    #
+    # Returns:
+    #   A list of the tile dictionaries that were deleted.
+    def removeOffgridTilesAt(self, pos):
+        removed = []
+        for tileId in self.offgridTiles.queryPoint(pos):
+            removed.append(self.offgridTiles.tiles[tileId])
+            self.offgridTiles.remove(tileId)
+        return removed
+
+    # Get the off-grid tiles overlapping a rectangle.
+    #
+    # Args:
+    #   rect (pygame.Rect): The area in pixels.
+    #
+    # Returns:
+    #   A list of tile dictionaries in the order they are drawn.
+    def offgridTilesIn(self, rect):
+        return [self.offgridTiles.tiles[tileId] for tileId in self.offgridTiles.query(rect)]
+
     # Get rectangles for tiles with physics interactions surrounding the given position.
     #
     # Args:
@@ -116,8 +280,8 @@ class Tilemap:
     #   surface: The surface (e.g., game window) to draw tiles on.
     def render(self, surface, offset=(0,0)):
 
-        # Draw off-grid tiles stored in the list.
-        for tile in self.offgridTiles:
+        # Draw only the off-grid tiles that overlap the camera.
+        for tile in self.offgridTilesIn(pygame.Rect(offset[0], offset[1], surface.get_width(), surface.get_height())):
 
             # Using the list of offset tiles to access the map assets in game class
             # tile['type'] represent the key in the assets dictionary while 
@@ -151,11 +315,18 @@ class Tilemap:
                     surface.blit(self.game.assets[tile['type']][tile['variant']], (tile['pos'][0] * self.tileSize - offset[0], tile['pos'][1] * self.tileSize - offset[1]))
     
     def save(self, path):
+        mapData = {'tilemap': self.tilemap, 'tileSize': self.tileSize, 'offgrid': list(self.offgridTiles.tiles.values())}
+
+        # A .lvl path is written in the packed binary level format instead of JSON.
+        if path.endswith('.lvl'):
+            levelFormat.save(path, levelFormat.fromJson(mapData))
+            return
+
         # Goes to the folder/path that is given and writes a json file there with all of the 
         # information regarding the tilemap, tile size, and off grid tiles in that json.
         # 'w' - write to file
         file = open(path, 'w')
-        json.dump( {'tilemap': self.tilemap, 'tileSize': self.tileSize, 'offgrid': self.offgridTiles}, file)
+        json.dump(mapData, file)
 
 
     def load(self, path=None):
@@ -173,7 +344,7 @@ class Tilemap:
             path = filedialog.askopenfilename( 
                 # filetypes adds a filter for json files to only appear.
                 # The format is ( "[Text displayed]", "*[Filtered file]")
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+                filetypes=[("JSON files", "*.json"), ("Level files", "*.lvl"), ("All files", "*.*")],
 
                 # This is the text that will appear on the UI of the level loader.
                 title="Load Map"
@@ -184,17 +355,53 @@ class Tilemap:
         # If the user picked a file in the level loader UI, load all of the contents from the json
         if path:
             try:
+                # .lvl files are in the packed binary level format and fill the tilemap
+                # straight from the file's arrays.
+                if path.endswith('.lvl'):
+                    self.loadLevel(levelFormat.load(path))
+                    return True
+
                 # Goes to the folder/path that is given and reads a json file there with all of the 
                 # information regarding the tilemap, tile size, and off grid tiles in that json.
                 # 'r' - read to file
                 with open(path, 'r') as file:
                     mapData = json.load(file)
-                    file.close()
-                    self.tilemap = mapData['tilemap']
-                    self.tileSize = mapData['tileSize']
-                    self.offgridTiles = mapData['offgrid']
+
+                self.tilemap = mapData['tilemap']
+                self.tileSize = mapData['tileSize']
+                self.offgridTiles = OffgridIndex()
+                for tile in mapData['offgrid']:
+                    self.addOffgridTile(tile)
                 return True
             except FileNotFoundError:
                 return False
             
         return False
+
+    # Fill the tilemap from a level in the packed binary format.
+    #
+    # The arrays of the level are memoryviews of the mapped file. Each one is read in a single
+    # tolist() call and the tile dictionaries are built from those lists in one pass, instead
+    # of first building the JSON dictionary with levelFormat.toJson() and then copying it in.
+    # Building thousands of tile dictionaries at once would set off garbage collections that
+    # only find live tiles, so collection is paused until the tilemap is filled.
+    #
+    # Args:
+    #   level (LevelData): A level returned by levelFormat.load().
+    def loadLevel(self, level):
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            names = level.typeNames
+            tilemap = {}
+            for x, y, t, variant in zip(level.gridX.tolist(), level.gridY.tolist(), level.gridType.tolist(), level.gridVariant.tolist()):
+                tilemap[f'{x};{y}'] = {'type': names[t], 'variant': variant, 'pos': [x, y]}
+
+            self.tilemap = tilemap
+            self.tileSize = level.tileSize
+            self.offgridTiles = OffgridIndex()
+            for x, y, t, variant in zip(level.offX.tolist(), level.offY.tolist(), level.offType.tolist(), level.offVariant.tolist()):
+                self.addOffgridTile({'type': names[t], 'variant': variant, 'pos': [x, y]})
+        finally:
+            if collecting:
+                gc.enable()
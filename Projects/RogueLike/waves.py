@@ -0,0 +1,179 @@
+import math
+import random
+from character import Enemy
+
+# Wave curves for the WaveDirector. Each wave lasts waveLength frames, and the keyframes are
+# (wave, maxEnemy, spawnDelay, spawnCount): how many enemies can be alive at once, how many
+# frames pass between spawns, and how many enemies each spawn adds. Waves between two
+# keyframes are interpolated, and waves after the last keyframe keep its values.
+WAVE_CURVES = {
+    # Starts out like the old fixed spawner (5 enemies, one every 180 frames) and slowly ramps up.
+    'default': {
+        'waveLength': 1800,
+        'keyframes': [(0, 5, 180, 1), (10, 40, 90, 2), (20, 80, 60, 4)],
+    },
+
+    # Late game density for stress testing: several hundred enemies within a few minutes.
+    'stress': {
+        'waveLength': 600,
+        'keyframes': [(0, 20, 20, 4), (5, 200, 10, 10), (10, 500, 5, 20)],
+    },
+}
+
+
+"""
+WaveDirector
+
+Description:
+    Decides when enemies spawn and how many can be alive, following one of the wave curves.
+    The game asks it every frame how many enemies to spawn and reads maxEnemy from it.
+
+Public Methods:
+    - settings(wave)                Returns (maxEnemy, spawnDelay, spawnCount) for a wave.
+    - peak()                        Returns the highest maxEnemy the curve ever reaches.
+    - update()                      Advances one frame and returns how many enemies to spawn.
+
+Usage:
+    - self.waveDirector = WaveDirector(WAVE_CURVES['default'])
+    - for i in range(self.waveDirector.update()):
+          self.spawnEnemy()
+"""
+
+class WaveDirector:
+    def __init__(self, curve):
+        self.waveLength = curve['waveLength']
+        self.keyframes = sorted(curve['keyframes'])
+
+        self.wave = 0
+        self.waveTimer = 0
+        self.spawnTimer = 0
+        self.maxEnemy, self.spawnDelay, self.spawnCount = self.settings(0)
+
+    # Args:
+    #   wave (int): The wave number, starting from 0.
+    # Returns:
+    #   (maxEnemy, spawnDelay, spawnCount) for the wave, interpolated between the keyframes.
+    def settings(self, wave):
+        first = self.keyframes[0]
+        if wave <= first[0]:
+            return first[1:]
+
+        for start, end in zip(self.keyframes, self.keyframes[1:]):
+            if wave <= end[0]:
+                t = (wave - start[0]) / (end[0] - start[0])
+                return tuple(round(a + (b - a) * t) for a, b in zip(start[1:], end[1:]))
+
+        return self.keyframes[-1][1:]
+
+    def peak(self):
+        return max(keyframe[1] for keyframe in self.keyframes)
+
+    # Returns:
+    #   How many enemies should be spawned this frame.
+    def update(self):
+        self.waveTimer += 1
+        if self.waveTimer >= self.waveLength:
+            self.waveTimer = 0
+            self.wave += 1
+            self.maxEnemy, self.spawnDelay, self.spawnCount = self.settings(self.wave)
+
+        self.spawnTimer += 1
+        if self.spawnTimer > self.spawnDelay:
+            self.spawnTimer = 0
+            return self.spawnCount
+        return 0
+
+
+"""
+EnemyPool
+
+Description:
+    Keeps enemies that died so they can be reused by the next spawn instead of allocating a
+    new Enemy every time. The pool is filled up front with as many enemies as the wave curve
+    can have alive at once, so even the densest waves don't allocate while playing and the
+    garbage collector has nothing to clean up.
+
+Public Methods:
+    - acquire(pos)                  Returns an enemy reset to full health at pos.
+    - release(enemy)                Gives a dead enemy back to the pool.
+
+Usage:
+    - self.enemyPool = EnemyPool(self, (16, 20), self.waveDirector.peak())
+    - self.enemies.append(self.enemyPool.acquire((x, y)))
+    - self.enemyPool.release(enemy)
+"""
+
+class EnemyPool:
+    def __init__(self, game, size, count=0):
+        self.game = game
+        self.size = size
+        self.free = [Enemy(game, (0, 0), size) for i in range(count)]
+
+    def acquire(self, pos):
+        if self.free:
+            enemy = self.free.pop()
+            enemy.reset(pos)
+            return enemy
+        return Enemy(self.game, pos, self.size)
+
+    def release(self, enemy):
+        self.free.append(enemy)
+
+
+"""
+SpawnRing
+
+Description:
+    The tiles enemies can spawn on around the player. The tile offsets whose centers are between
+    minDistance and maxDistance pixels from the player's tile are worked out once. Whenever the
+    flow field is recomputed the offsets are checked against it, and only the tiles it reached
+    are kept, so an enemy never spawns inside a wall or somewhere walled off from the player.
+    The tile below has to be reached too because enemies are taller than one tile.
+
+Public Methods:
+    - update(flowField)             Rebuilds the spawn tiles around the flow field's origin.
+    - choose()                      Returns the pixel position of a random spawn tile, or None.
+
+Usage:
+    - self.spawnRing = SpawnRing(self.tilemap.tileSize, 150, 250)
+    - if self.flowField.update(self.player.rect().center):
+          self.spawnRing.update(self.flowField)
+    - pos = self.spawnRing.choose()
+"""
+
+class SpawnRing:
+    def __init__(self, tileSize, minDistance, maxDistance):
+        self.tileSize = tileSize
+
+        # Tile offsets from the player's tile that are inside the ring.
+        reach = math.ceil(maxDistance / tileSize)
+        self.offsets = [(x, y) for x in range(-reach, reach + 1) for y in range(-reach, reach + 1)
+                        if minDistance <= math.hypot(x, y) * tileSize <= maxDistance]
+
+        # Pixel positions of the tiles an enemy can spawn on right now.
+        self.cells = []
+
+    def update(self, flowField):
+        self.cells.clear()
+        if flowField.origin is None:
+            return
+
+        size = flowField.size
+        left = flowField.origin[0] - flowField.radius - 1
+        top = flowField.origin[1] - flowField.radius - 1
+        nextTile = flowField.next
+        for x, y in self.offsets:
+            # Offsets past the edge of the field are never reached by it.
+            column = x + flowField.radius + 1
+            row = y + flowField.radius + 1
+            if not (0 < column < size - 1 and 0 < row < size - 2):
+                continue
+
+            i = row * size + column
+            if nextTile[i] != -1 and nextTile[i + size] != -1:
+                self.cells.append(((left + column) * self.tileSize, (top + row) * self.tileSize))
+
+    def choose(self):
+        if not self.cells:
+            return None
+        return random.choice(self.cells)
@@ -0,0 +1,117 @@
+import gc
+import os
+import random
+import sys
+import time
+
+# runs without opening a window so the benchmark can be run anywhere
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+# the benchmark is run from the platformer folder like main.py
+# (python benchmarks/collision.py) so the scripts folder and the
+# data/ and levels/ paths can be found
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from scripts.util import loadImages, animation, AssetRegistry
+from scripts.beings import physicsBeing
+from scripts.tilemap import tilemap
+from scripts.timestep import FixedTimestep
+
+ENEMIES = 200
+FRAMES = 1000
+
+# stands in for the game object since physicsBeing only needs the
+# enemy animations and the timestep and the tilemap only needs the
+# tile images
+class collisionGame:
+    def __init__(self):
+        pygame.init()
+        self.screen = pygame.display.set_mode((640,480))
+        self.timestep = FixedTimestep()
+        self.assets = AssetRegistry({
+            'decor' : lambda: loadImages('tiles/decor'),
+            'grass' : lambda: loadImages('tiles/grass'),
+            'large_decor' : lambda: loadImages('tiles/large_decor'),
+            'stone' : lambda: loadImages('tiles/stone'),
+            'enemy/idle': lambda: animation(loadImages('entities/enemy/idle'), imgDur=6),
+        })
+
+def percentile(times, p):
+    return times[min(len(times) - 1, int(len(times) * p / 100))]
+
+# true if the being's box overlaps a solid tile. the floats of pos are
+# used since being.rect() rounds them down to whole pixals
+def insideTile(tiles, being):
+    x, y = being.pos
+    w, h = being.size
+    for tile in tiles.physicsRectsIn(being.rect().inflate(2, 2)):
+        if x < tile.left + tile.width and x + w > tile.left and y < tile.top + tile.height and y + h > tile.top:
+            return True
+    return False
+
+# puts a being inside of every solid tile of the level, like a bad spawn
+# or a tile placed on top of it. a being that only falls should be pushed
+# up out of the tile, never down through it. a being that walks should
+# be pushed back out of the side it walked in from, never through it
+def embeddedCheck(game, tiles, ticks=40):
+    size = tiles.tileSize
+    solid = [(x, y) for x, y, tId, variant in tiles.tiles() if tiles.solidIds[tId]]
+    stuck = fellThrough = walkedThrough = 0
+    for x, y in solid:
+        being = physicsBeing(game, 'enemy', (x * size + 4, y * size + 1), (8, 15))
+        for tick in range(ticks):
+            being.update(tiles, (0, 0))
+        stuck += insideTile(tiles, being)
+        fellThrough += being.pos[1] > y * size
+
+        for move in (-1, 1):
+            being = physicsBeing(game, 'enemy', (x * size + 4, y * size + 1), (8, 15))
+            being.update(tiles, (move, 0))
+            if move > 0:
+                walkedThrough += being.pos[0] >= (x + 1) * size
+            else:
+                walkedThrough += being.pos[0] + being.size[0] <= x * size
+    print('embedded starts %d  still inside a tile %d  fell through %d  walked through %d' % (len(solid), stuck, fellThrough, walkedThrough))
+
+def run(level):
+    random.seed(0)
+    game = collisionGame()
+    tiles = tilemap(game, tilesize=16)
+    tiles.load('levels/' + str(level) + '.json')
+
+    # drops the enemies all over the level with the same
+    # size used for the enemies in game.loadMap
+    xs = [x for x, y, tId, variant in tiles.tiles()]
+    ys = [y for x, y, tId, variant in tiles.tiles()]
+    beings = []
+    for i in range(ENEMIES):
+        pos = (random.uniform(min(xs), max(xs)) * tiles.tileSize, random.uniform(min(ys) - 4, max(ys)) * tiles.tileSize)
+        beings.append(physicsBeing(game, 'enemy', pos, (8, 15)))
+    moves = [random.choice((-1, 0, 1)) for i in range(ENEMIES)]
+
+    frameTimes = []
+    collections = gc.get_stats()[0]['collections']
+    for frame in range(FRAMES):
+        # every enemy walks one way for a while then turns around
+        if frame % 60 == 0:
+            moves = [random.choice((-1, 0, 1)) for i in range(ENEMIES)]
+
+        start = time.perf_counter()
+        for i in range(ENEMIES):
+            beings[i].update(tiles, (moves[i], 0))
+        frameTimes.append((time.perf_counter() - start) * 1000)
+    collections = gc.get_stats()[0]['collections'] - collections
+
+    frameTimes.sort()
+    print('%d enemies, %d frames' % (ENEMIES, FRAMES))
+    print('update all     mean %.3f ms  p50 %.3f ms  p95 %.3f ms  p99 %.3f ms' % (
+        sum(frameTimes) / len(frameTimes), percentile(frameTimes, 50), percentile(frameTimes, 95), percentile(frameTimes, 99)))
+    print('gen 0 gc collections %d' % collections)
+    # some of the enemies were dropped inside of tiles so this also
+    # checks that they all got pushed out
+    print('enemies inside a tile at the end %d' % sum(insideTile(tiles, being) for being in beings))
+    embeddedCheck(game, tiles)
+
+if __name__ == '__main__':
+    run(sys.argv[1] if len(sys.argv) > 1 else 2)
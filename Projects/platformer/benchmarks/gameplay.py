@@ -0,0 +1,183 @@
+import json
+import os
+import random
+import sys
+import time
+
+# the benchmark is run from the platformer folder like main.py
+# (python benchmarks/gameplay.py) so the scripts folder and the
+# data/ and levels/ paths can be found
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TICKS = 1800
+LEVELS = (0, 1, 2)
+
+# the parts of the game that are timed. each one is timed on its own
+# every tick and the times of the ticks are what the percentiles are of
+SUBSYSTEMS = ('tilemap.render', 'entities.update', 'particles', 'sparks', 'projectiles', 'scale blit')
+
+def percentile(times, p):
+    return times[min(len(times) - 1, int(len(times) * p / 100))]
+
+# makes the input that is played back when no recording is given.
+# the player runs one way for a while then turns around and jumps
+# and dashes every so often. the same seed always gives the same input
+def scriptedInput(ticks, seed=0):
+    rng = random.Random(seed)
+    events = []
+    direction = 'right'
+    events.append([0, direction, True])
+    turn = rng.randint(60, 180)
+    for tick in range(ticks):
+        if tick == turn:
+            events.append([tick, direction, False])
+            direction = 'left' if direction == 'right' else 'right'
+            events.append([tick, direction, True])
+            turn = tick + rng.randint(60, 180)
+        if rng.random() < 1 / 40:
+            events.append([tick, 'jump'])
+        if rng.random() < 1 / 150:
+            events.append([tick, 'dash'])
+    return events
+
+# a recording is a list of [tick, 'left' or 'right', pressed] and
+# [tick, 'jump' or 'dash'] events in the order they happened
+def applyInput(game, event):
+    if event[1] == 'left':
+        game.movement[0] = event[2]
+    elif event[1] == 'right':
+        game.movement[1] = event[2]
+    elif event[1] == 'jump':
+        game.player.jump()
+    elif event[1] == 'dash':
+        game.player.dash()
+
+# plays the game in a window like normal and saves what the player did
+# each tick to path so it can be played back by the benchmark
+def record(path, level):
+    from main import game
+
+    recording = game()
+    recording.loadMap(level)
+    recording.levelCounter = level
+    events = []
+    tick = [0]
+    movement = list(recording.movement)
+
+    update = recording.update
+    def recordedUpdate():
+        for i, name in enumerate(('left', 'right')):
+            if recording.movement[i] != movement[i]:
+                movement[i] = recording.movement[i]
+                events.append([tick[0], name, movement[i]])
+        update()
+        tick[0] += 1
+    recording.update = recordedUpdate
+
+    for name in ('jump', 'dash'):
+        def recordedAction(action=getattr(recording.player, name), name=name):
+            events.append([tick[0], name])
+            return action()
+        setattr(recording.player, name, recordedAction)
+
+    # the game calls sys.exit when the window is closed
+    try:
+        recording.run()
+    except SystemExit:
+        pass
+    with open(path, 'w') as f:
+        json.dump(events, f)
+    print('recorded %d ticks to %s' % (tick[0], path))
+
+# replaces the method name of obj with one that adds the time it
+# took to the running total of the subsystem for this tick
+def timeMethod(obj, name, totals, subsystem):
+    method = getattr(obj, name)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        result = method(*args, **kwargs)
+        totals[subsystem] += time.perf_counter() - start
+        return result
+    setattr(obj, name, timed)
+
+def run(level, events, ticks):
+    from main import game
+    from scripts.beings import Player, Enemy
+    from scripts.tilemap import tilemap
+    from shared.transformCache import transforms
+
+    transforms.clear()
+
+    benchGame = game()
+    # when the player dies or beats the level the same level is loaded
+    # again so every tick of the run is spent on the level being timed
+    loadMap = benchGame.loadMap
+    def reloadLevel(mapName):
+        loadMap(level)
+        benchGame.levelCounter = level
+    benchGame.loadMap = reloadLevel
+    benchGame.loadMap(level)
+
+    totals = dict.fromkeys(SUBSYSTEMS, 0)
+    for system in ('particles', 'sparks', 'projectiles'):
+        timeMethod(getattr(benchGame, system), 'update', totals, system)
+        timeMethod(getattr(benchGame, system), 'render', totals, system)
+    timeMethod(benchGame, 'blitScreen', totals, 'scale blit')
+    # the enemies and the tilemap are made again every time a level is
+    # loaded so their classes are timed instead. Player.update calls
+    # physicsBeing.update itself so only the top level updates are counted
+    playerUpdate, enemyUpdate, tilemapRender = Player.update, Enemy.update, tilemap.render
+    timeMethod(tilemap, 'render', totals, 'tilemap.render')
+    timeMethod(Player, 'update', totals, 'entities.update')
+    timeMethod(Enemy, 'update', totals, 'entities.update')
+
+    random.seed(level)
+    samples = {name: [] for name in SUBSYSTEMS + ('tick', 'frame')}
+    nextEvent = 0
+    try:
+        for tick in range(ticks):
+            while nextEvent < len(events) and events[nextEvent][0] <= tick:
+                applyInput(benchGame, events[nextEvent])
+                nextEvent += 1
+
+            for name in SUBSYSTEMS:
+                totals[name] = 0
+            start = time.perf_counter()
+            benchGame.update()
+            updated = time.perf_counter()
+            benchGame.render()
+            end = time.perf_counter()
+
+            for name in SUBSYSTEMS:
+                samples[name].append(totals[name] * 1000)
+            samples['tick'].append((updated - start) * 1000)
+            samples['frame'].append((end - start) * 1000)
+    finally:
+        Player.update, Enemy.update, tilemap.render = playerUpdate, enemyUpdate, tilemapRender
+
+    print('level %s (%d ticks, %d enemies left, transform cache %d hits %d misses)' % (
+        level, ticks, len(benchGame.enemies), transforms.hits, transforms.misses))
+    for name, times in samples.items():
+        times.sort()
+        print('  %-16s mean %.3f ms  p50 %.3f ms  p95 %.3f ms  p99 %.3f ms' % (
+            name, sum(times) / len(times), percentile(times, 50), percentile(times, 95), percentile(times, 99)))
+
+# python benchmarks/gameplay.py [input.json] plays back the input over
+# levels 0 to 2 without a window and prints how long each part took.
+# python benchmarks/gameplay.py --record input.json [level] opens the
+# game in a window and records the input to play back later
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--record':
+        record(sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else 0)
+    else:
+        # runs without opening a window so the benchmark can be run anywhere
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        if len(sys.argv) > 1:
+            with open(sys.argv[1]) as f:
+                events = json.load(f)
+            ticks = max([TICKS] + [event[0] + 1 for event in events])
+        else:
+            events = scriptedInput(TICKS)
+            ticks = TICKS
+        for level in LEVELS:
+            run(level, events, ticks)
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+
+# runs without opening a window so the benchmark can be run anywhere
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+# the benchmark is run from the platformer folder like main.py
+# (python benchmarks/startup.py) so the scripts folder and the
+# data/ and levels/ paths can be found
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts import util
+from main import game
+
+RUNS = 30
+
+def percentile(times, p):
+    return times[min(len(times) - 1, int(len(times) * p / 100))]
+
+# times how long it takes to make the game object (loading the images
+# and the first level) and to get the first frame on the screen, with
+# and without the packed atlas
+def run():
+    for name, useAtlas in (('per file', False), ('atlas', True)):
+        if useAtlas and not os.path.exists(util.manifestPath):
+            print('no atlas, run python -m scripts.atlas first')
+            continue
+        util.useAtlas = useAtlas
+        times = []
+        firstFrames = []
+        for i in range(RUNS):
+            # forgets the atlas so it is loaded again like a new start
+            util.atlas = None
+            util.atlasFolders = None
+            start = time.perf_counter()
+            startGame = game()
+            made = time.perf_counter()
+            startGame.update()
+            startGame.render()
+            end = time.perf_counter()
+            times.append((made - start) * 1000)
+            firstFrames.append((end - start) * 1000)
+        times.sort()
+        firstFrames.sort()
+        print('%-9s game() p50 %.2f ms  p95 %.2f ms   first frame p50 %.2f ms  p95 %.2f ms' % (
+            name, percentile(times, 50), percentile(times, 95), percentile(firstFrames, 50), percentile(firstFrames, 95)))
+
+    # the asset groups that were loaded to get to the first frame
+    startGame.assets.report()
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,69 @@
+import math
+import os
+import sys
+
+# runs without opening a window so the check can be run anywhere
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+# the check is run from the platformer folder like main.py
+# (python benchmarks/tickRate.py) so the scripts folder and the
+# data/ and levels/ paths can be found
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gameplay import scriptedInput, applyInput
+from scripts.timestep import TICKRATE
+
+# each run plays a few seconds of the gameplay benchmark's scripted
+# input. longer runs drift apart: a rate that hits a wall, ceiling or
+# ledge part of a tick sooner lands a bit differently and the next jump
+# goes somewhere else, so short runs on a few seeds are compared instead
+SECONDS = 3
+SEEDS = range(5)
+LEVELS = (0, 1, 2)
+RATES = (60, 120)
+# how many pixals apart the player is allowed to end up between the rates.
+# a rate can still hit a ceiling or leave a ledge part of a tick sooner
+# so the player can be falling a little ahead for the rest of the run
+TOLERANCE = 4
+
+# plays the input on a level at rate ticks a second and returns where
+# the player ends up. the input is still given every TICKRATE tick
+def play(level, events, rate):
+    from main import game
+
+    checkGame = game()
+    # the enemies walk and shoot at random, which can't be the same at
+    # two rates, so they are moved far under the level where they just
+    # fall. the level still has enemies left so it doesn't end
+    loadMap = checkGame.loadMap
+    def reloadLevel(mapName):
+        loadMap(level)
+        checkGame.levelCounter = level
+        for enemy in checkGame.enemies:
+            enemy.pos[1] += 100000
+    checkGame.loadMap = reloadLevel
+    checkGame.loadMap(level)
+
+    nextEvent = 0
+    for tick in range(SECONDS * TICKRATE):
+        while nextEvent < len(events) and events[nextEvent][0] <= tick:
+            applyInput(checkGame, events[nextEvent])
+            nextEvent += 1
+        # the ticks at this rate that make up one TICKRATE tick
+        ticks = round((tick + 1) * rate / TICKRATE) - round(tick * rate / TICKRATE)
+        checkGame.simulate(ticks, seed=None if tick else level, rate=rate)
+    return tuple(checkGame.player.pos)
+
+if __name__ == '__main__':
+    worst = 0
+    for level in LEVELS:
+        apart = []
+        for seed in SEEDS:
+            events = scriptedInput(SECONDS * TICKRATE, seed)
+            ends = [play(level, events, rate) for rate in RATES]
+            apart.append(math.dist(ends[0], ends[-1]))
+        worst = max(worst, max(apart))
+        print('level %d  %s Hz  apart after %d s: %s px' % (
+            level, ' vs '.join(str(rate) for rate in RATES), SECONDS, ' '.join('%.2f' % d for d in apart)))
+    print('worst %.2f px (tolerance %d px)' % (worst, TOLERANCE))
+    sys.exit(0 if worst <= TOLERANCE else 1)
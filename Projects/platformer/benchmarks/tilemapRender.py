@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+
+# runs without opening a window so the benchmark can be run anywhere
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+# the benchmark is run from the platformer folder like main.py
+# (python benchmarks/tilemapRender.py) so the scripts folder and the
+# data/ and levels/ paths can be found
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from scripts.util import loadImages
+from scripts.tilemap import tilemap
+
+FRAMES = 2000
+
+# stands in for the game object since tilemap only needs the assets
+class renderGame:
+    def __init__(self):
+        pygame.init()
+        self.screen = pygame.display.set_mode((640,480))
+        self.display = pygame.Surface((320, 240))
+        self.assets = {
+            'decor' : loadImages('tiles/decor'),
+            'grass' : loadImages('tiles/grass'),
+            'large_decor' : loadImages('tiles/large_decor'),
+            'stone' : loadImages('tiles/stone'),
+        }
+
+def percentile(times, p):
+    return times[min(len(times) - 1, int(len(times) * p / 100))]
+
+def run(level):
+    game = renderGame()
+    tiles = tilemap(game, tilesize=16)
+    tiles.load('levels/' + str(level) + '.json')
+    # the spawners are taken out of the map in game.loadMap
+    # so they are not drawn in the game either
+    tiles.extract([('spawners', 0), ('spawners', 1)])
+
+    # pans the camera back and forth over the whole level
+    # the same way the camera follows the player in game.run
+    xs = [x for x, y, tId, variant in tiles.tiles()]
+    ys = [y for x, y, tId, variant in tiles.tiles()]
+    left = min(xs) * tiles.tileSize - 160
+    right = max(xs) * tiles.tileSize - 160
+    top = min(ys) * tiles.tileSize - 120
+    bottom = max(ys) * tiles.tileSize - 120
+
+    renderTimes = []
+    frameTimes = []
+    for frame in range(FRAMES):
+        t = abs((frame % 400) - 200) / 200
+        offset = (int(left + (right - left) * t), int(top + (bottom - top) * t))
+
+        start = time.perf_counter()
+        game.display.fill((0,0,0))
+        tiles.render(game.display, offset=offset)
+        rendered = time.perf_counter()
+        game.screen.blit(pygame.transform.scale(game.display, game.screen.get_size()), (0,0))
+        end = time.perf_counter()
+
+        renderTimes.append((rendered - start) * 1000)
+        frameTimes.append((end - start) * 1000)
+
+    for name, times in (('tilemap.render', renderTimes), ('render + scale', frameTimes)):
+        times.sort()
+        print('%-16s mean %.3f ms  p50 %.3f ms  p95 %.3f ms  p99 %.3f ms' % (
+            name, sum(times) / len(times), percentile(times, 50), percentile(times, 95), percentile(times, 99)))
+
+if __name__ == '__main__':
+    run(sys.argv[1] if len(sys.argv) > 1 else 2)
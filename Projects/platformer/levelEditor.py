@@ -1,14 +1,20 @@
+import os
 import sys
 import pygame
+from scripts import util
 from scripts.util import loadImages
+from scripts.atlas import staleImages
 from scripts.tilemap import tilemap
+from shared.dirtyRects import DirtyRects
 
 RENDERSCALE = 2.0
 
 
 class editor:
 
-    def __init__(self):
+    # with dirtyRects on only the parts of the screen that changed are
+    # drawn again each frame, with it off everything is drawn every frame
+    def __init__(self, dirtyRects=True):
         
         # initiates pygame
         pygame.init()
@@ -23,6 +29,13 @@ class editor:
         # makes a small display ontop of the screen 
         self.display = pygame.Surface((320, 240))
 
+        # the editor is where new images show up first so it checks the
+        # atlas against data/images and loads the images one file at a
+        # time when the atlas is out of date
+        if os.path.exists(util.manifestPath) and staleImages():
+            print('data/atlas.png is out of date, run python -m scripts.atlas to rebuild it')
+            util.useAtlas = False
+
 
         # dictionary for assets
         self.assets = {
@@ -62,16 +75,52 @@ class editor:
         self.shift = False
         self.ongrid = True
 
+        self.dirtyRects = dirtyRects
+        self.dirty = DirtyRects(self.display, self.screen)
+        # what was on the screen last frame so the editor can tell what
+        # changed. the camera position, where the see through tile was
+        # drawn and which tile was selected
+        self.lastScroll = None
+        self.lastPreview = None
+        self.lastSelected = None
+        # the biggest tile image, a placed tile can change what is drawn
+        # this far to the right and below its neighbors
+        self.maxTileSize = (max(img.get_width() for imgs in self.assets.values() for img in imgs),
+                            max(img.get_height() for imgs in self.assets.values() for img in imgs))
+
+    # marks the part of the screen a grid tile at (x, y) and the 8
+    # tiles around it are drawn in, auto tiling can change all of them
+    def markTile(self, x, y):
+        ts = self.tilemap.tileSize
+        self.dirty.mark(((x - 1) * ts - self.scroll[0], (y - 1) * ts - self.scroll[1], 2 * ts + self.maxTileSize[0], 2 * ts + self.maxTileSize[1]))
+
+    # marks the part of the screen an off grid tile is drawn in
+    def markOffGrid(self, tile):
+        img = self.assets[tile['type']][tile['variant']]
+        self.dirty.mark((tile['pos'][0] - self.scroll[0], tile['pos'][1] - self.scroll[1], img.get_width() + 1, img.get_height() + 1))
+
+    # draws the part of the display inside region again
+    def drawRegion(self, region, renderScroll, currentTileImg, previewPos):
+        # clipping the display to the region makes every blit outside of
+        # it do nothing so only the pixals in the region are drawn over
+        self.display.set_clip(region)
+        self.display.fill((0,0,0))
+        self.tilemap.render(self.display, offset=renderScroll)
+        self.display.blit(currentTileImg, previewPos)
+        self.display.blit(currentTileImg, (5,5))
+        self.display.set_clip(None)
+
     def run(self):
         while True:
-            self.display.fill((0,0,0))
-
             self.scroll[0] += (self.movement[1] - self.movement[0]) * 2
             self.scroll[1] += (self.movement[3] - self.movement[2]) * 2
 
             renderScroll = (int(self.scroll[0]), int(self.scroll[1]))
 
-            self.tilemap.render(self.display, offset=renderScroll)
+            # everything on the screen moves with the camera
+            if renderScroll != self.lastScroll or not self.dirtyRects:
+                self.dirty.markAll()
+                self.lastScroll = renderScroll
 
             # the self.tileList has all of the keys to self.assets map
             # so doing self.tileList[self.tileGroup] specifies which 
@@ -98,32 +147,41 @@ class editor:
             if self.ongrid:
 
                 # dispay the tile before actually placing it down.
-                self.display.blit(currentTileImg, (tilePos[0] * self.tilemap.tileSize - self.scroll[0], tilePos[1] * self.tilemap.tileSize - self.scroll[1]))
+                previewPos = (tilePos[0] * self.tilemap.tileSize - self.scroll[0], tilePos[1] * self.tilemap.tileSize - self.scroll[1])
             else: 
-                self.display.blit(currentTileImg, mousePos)
+                previewPos = mousePos
+
+            # the see through tile is drawn again where it was and where it
+            # is now if the mouse moved or a different tile was selected.
+            # the selected tile in the corner changes with the selection
+            preview = pygame.Rect(previewPos, currentTileImg.get_size()).inflate(2, 2)
+            selected = (self.tileGroup, self.tileVar)
+            if preview != self.lastPreview or selected != self.lastSelected:
+                if self.lastPreview is not None:
+                    self.dirty.mark(self.lastPreview)
+                self.dirty.mark(preview)
+                if selected != self.lastSelected:
+                    self.dirty.mark((4, 4, self.maxTileSize[0] + 2, self.maxTileSize[1] + 2))
+                self.lastPreview = preview
+                self.lastSelected = selected
             
             # will only place down tile ongrid
             #  if left clicking and is ongrid
+            # grass and stone are auto tiled as they are painted so the
+            # tiles around the placed or deleted tile are fixed up right away
             if self.leftClick and self.ongrid:
-                self.tilemap.tilemap[str(tilePos[0]) + ';' + str(tilePos[1])] = {
-                    'type': self.tileList[self.tileGroup], 'variant': self.tileVar, 'pos': tilePos
-                }
+                if self.tilemap.setTile(tilePos[0], tilePos[1], self.tileList[self.tileGroup], self.tileVar, autoTile=True):
+                    self.markTile(tilePos[0], tilePos[1])
             if self.rightClick:
-                # creating a variable to store the tile position
-                tileLoc = str(tilePos[0]) + ';' + str(tilePos[1])
-
                 # if there is a tile at the tile position,
                 # delete it when right clicking on mouse.
-                if tileLoc in self.tilemap.tilemap:
-                    del self.tilemap.tilemap[tileLoc]
-                # makes a copy so don't mess up the offgrid tiles if 
-                # deleted
-                for tile in self.tilemap.offGridT.copy():
-                    tileImg = self.assets[tile['type']][tile['variant']]
-                    tileR = pygame.Rect(tile['pos'][0] - self.scroll[0], tile['pos'][1] - self.scroll[1], tileImg.get_width(), tileImg.get_height())
-                    if tileR.collidepoint(mousePos):
-                        self.tilemap.offGridT.remove(tile)
-            self.display.blit(currentTileImg, (5,5))
+                if self.tilemap.removeTile(tilePos[0], tilePos[1], autoTile=True):
+                    self.markTile(tilePos[0], tilePos[1])
+                # deletes the offgrid tiles under the mouse. the mouse
+                # position is moved into the world with the scroll so
+                # only the tiles near the mouse have to be checked
+                for tile in self.tilemap.removeOffGridAt((mousePos[0] + self.scroll[0], mousePos[1] + self.scroll[1])):
+                    self.markOffGrid(tile)
 
             # pygame.event.get() gets the user's input
             for event in pygame.event.get():
@@ -142,7 +200,9 @@ class editor:
                     if event.button == 1:
                             self.leftClick = True
                             if not self.ongrid:
-                                self.tilemap.offGridT.append({'type': self.tileList[self.tileGroup], 'variant': self.tileVar, 'pos': (mousePos[0] + self.scroll[0], mousePos[1] + self.scroll[1])})
+                                tile = {'type': self.tileList[self.tileGroup], 'variant': self.tileVar, 'pos': (mousePos[0] + self.scroll[0], mousePos[1] + self.scroll[1])}
+                                self.tilemap.addOffGrid(tile)
+                                self.markOffGrid(tile)
                     if event.button == 3:
                         self.rightClick = True
                     
@@ -178,6 +238,7 @@ class editor:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_t:
                         self.tilemap.autoTile()
+                        self.dirty.markAll()
                     if event.key == pygame.K_g:
                         self.ongrid = not self.ongrid
                     if event.key == pygame.K_s:
@@ -222,13 +283,15 @@ class editor:
                     if event.key == pygame.K_LSHIFT:
                         self.shift = False
 
-            # rendering the display(small sreen) at 0,0
-            # rescales the screen so like zooms in so player is not tiny
-            # pygame.transform.scale([thing want to scale], [how much 
-            # want to scale])
-            self.screen.blit(pygame.transform.scale(self.display,self.screen.get_size()), (0,0))
-            # Updates the screen
-            pygame.display.update()
+            # draws the parts of the display that changed again then
+            # rescales them onto the screen so like zooms in so player is
+            # not tiny and updates only those parts of the screen.
+            # nothing is drawn if nothing changed
+            if self.dirty:
+                regions = self.dirty.regions()
+                for region in regions:
+                    self.drawRegion(region, renderScroll, currentTileImg, previewPos)
+                self.dirty.present(regions)
             # forces loop to run at 60 fphs
             self.clock.tick(60)
 
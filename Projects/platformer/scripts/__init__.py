@@ -0,0 +1,10 @@
+import os
+import sys
+
+# the modules the platformer shares with the RogueLike are in
+# Projects/shared so the Projects folder is put on the path for
+# from shared.x import y. this runs the first time anything in
+# scripts is imported
+projectsPath = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if projectsPath not in sys.path:
+    sys.path.append(projectsPath)
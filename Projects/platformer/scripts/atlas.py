@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import sys
+import pygame
+
+# this is the build step for the texture atlas. every image under
+# data/images is packed into one big image (data/atlas.png) and where
+# each image ended up is written to data/atlas.json. util.loadImage and
+# util.loadImages then cut the images out of the atlas instead of loading
+# every png on their own. run it again after adding or changing images:
+#   python -m scripts.atlas           (from the platformer folder)
+# the manifest also keeps a hash of every png that went into the atlas so
+# an out of date atlas can be found without trusting file times (which
+# are just the checkout time after a clone). the game doesn't check this
+# when it starts, the level editor and this check do:
+#   python -m scripts.atlas --check   (exits with 1 if it is out of date)
+
+imagePath = 'data/images/'
+atlasPath = 'data/atlas.png'
+manifestPath = 'data/atlas.json'
+
+# space left between the images so they never touch
+PADDING = 1
+
+# finds every png under data/images. the keys are the paths that are
+# passed into loadImage and the images of a folder are in the order
+# loadImages returns them in
+def findImages():
+    folders = {}
+    for root, dirs, files in os.walk(imagePath):
+        folder = os.path.relpath(root, imagePath).replace(os.sep, '/')
+        names = sorted(name for name in files if name.endswith('.png'))
+        if names:
+            folders['' if folder == '.' else folder] = names
+    return folders
+
+# packs the images into rows (shelves). the tallest images go first so
+# every row is about as tall as the images in it. returns the size of
+# the atlas and the position of each image
+def pack(sizes, width):
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = rowHeight = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > width:
+            x = 0
+            y += rowHeight + PADDING
+            rowHeight = 0
+        positions[i] = (x, y)
+        x += w + PADDING
+        rowHeight = max(rowHeight, h)
+    return (width, y + rowHeight), positions
+
+# the sha1 of every png under data/images by its path from data/images
+def hashImages(folders):
+    hashes = {}
+    for folder, names in folders.items():
+        for name in names:
+            path = (folder + '/' if folder else '') + name
+            with open(imagePath + path, 'rb') as f:
+                hashes[path] = hashlib.sha1(f.read()).hexdigest()
+    return hashes
+
+# returns the images that were added, changed or removed since the atlas
+# was built. an empty list means the atlas is up to date
+def staleImages():
+    if not os.path.exists(manifestPath):
+        return ['data/atlas.json is missing']
+    with open(manifestPath) as f:
+        built = json.load(f).get('sources', {})
+    hashes = hashImages(findImages())
+    return sorted(path for path in built.keys() | hashes.keys() if built.get(path) != hashes.get(path))
+
+def buildAtlas():
+    folders = findImages()
+    paths = [(folder, name) for folder, names in folders.items() for name in names]
+    images = [pygame.image.load(imagePath + (folder + '/' if folder else '') + name) for folder, name in paths]
+    sizes = [img.get_size() for img in images]
+
+    # makes the atlas about square
+    area = sum((w + PADDING) * (h + PADDING) for w, h in sizes)
+    width = max(max(w for w, h in sizes), int(area ** 0.5))
+    size, positions = pack(sizes, width)
+
+    # the game loads images with .convert() which drops the alpha channel
+    # so only the colors are copied into the atlas. blitting would mix
+    # see through pixels with the black background instead
+    atlas = pygame.Surface(size, depth=24)
+    pixels = pygame.surfarray.pixels3d(atlas)
+    for img, (x, y), (w, h) in zip(images, positions, sizes):
+        pixels[x:x + w, y:y + h] = pygame.surfarray.array3d(img)
+    del pixels
+    pygame.image.save(atlas, atlasPath)
+
+    # folder -> the rect (x, y, width, height) of each of its images
+    manifest = {'image': os.path.basename(atlasPath), 'folders': {}, 'sources': hashImages(folders)}
+    for (folder, name), pos, imgSize in zip(paths, positions, sizes):
+        manifest['folders'].setdefault(folder, {})[name] = list(pos) + list(imgSize)
+    with open(manifestPath, 'w') as f:
+        json.dump(manifest, f, sort_keys=True)
+
+    print('packed %d images into a %dx%d atlas' % (len(images), size[0], size[1]))
+
+if __name__ == '__main__':
+    if '--check' in sys.argv:
+        stale = staleImages()
+        for path in stale:
+            print('out of date: ' + path)
+        if stale:
+            print('run python -m scripts.atlas to rebuild the atlas')
+            sys.exit(1)
+        print('the atlas is up to date')
+    else:
+        buildAtlas()
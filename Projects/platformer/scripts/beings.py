@@ -1,8 +1,8 @@
 import random
-from scripts.spark import Spark
 import pygame
 import math
-from scripts.particle import Particle
+from scripts.util import animationCursor
+from shared.transformCache import transforms
 
 class physicsBeing:
     def __init__(self, game, btype, pos, size):
@@ -14,8 +14,17 @@ class physicsBeing:
         # would chnage all of them at once like a copy construct when
         # dealing with pointers
         self.pos = list(pos)
+        # where the being was at the start of the last tick so it can
+        # be drawn part of the way between the last tick and this one
+        self.prevPos = list(pos)
         self.size = size
         self.velocity = [0,0]
+        # how fast the being can fall. it is lower for the player
+        # when it is sliding down a wall
+        self.maxFall = 5
+        # how much the x velocity slows down every TICKRATE tick. the
+        # player slows down after a dash or wall jump
+        self.slowdown = 0
         self.collision = {'up': False, 'down': False, 'right':False, 'left': False}
 
         self.action = ''
@@ -25,6 +34,9 @@ class physicsBeing:
         self.animOffset = (-3,-3)
         # lets player look left or right
         self.flip = False
+        # the being keeps the same animation cursor the whole time
+        # and only the clip it is playing changes
+        self.animation = animationCursor()
         self.setAction('idle')
         self.lastMovement = [0,0]
         
@@ -37,9 +49,9 @@ class physicsBeing:
             # is being animated the '/' is for directory with 
             # self.action which is a string that will specifty which 
             # image/animation to choose 
-            # .copy() makes sure each entity has their own animation
-            # and are not just sharing the same frame
-            self.animation = self.game.assets[self.type + '/' + self.action].copy()
+            # the clip is shared by every entity and the cursor
+            # keeps track of which frame this entity is on
+            self.animation.play(self.game.assets.clip(self.type, self.action))
             
     def rect(self):
         #self.pos[0] and self.pos[1] are the top left of the rectangle
@@ -47,31 +59,42 @@ class physicsBeing:
         return pygame.Rect(self.pos[0], self.pos[1], self.size[0], self.size[1])
 
     def update(self, tilemap,movement=(0,0)):
+        # the movement and velocity are in pixals per TICKRATE tick so
+        # they are scaled by how many of those ticks this tick is worth
+        step = self.game.timestep.step
+        self.prevPos = list(self.pos)
         self.collision ={'up': False, 'down': False, 'right':False, 'left':False}
-        framerMovement = (movement[0] + self.velocity[0], movement[1] + self.velocity[1])
+        framerMovement = ((movement[0] + self.velocity[0]) * step, (movement[1] + self.velocity[1]) * step)
+        # gravity speeds the being up every TICKRATE tick but a longer
+        # tick would only use the velocity from its start, so the
+        # falling it missed (or the extra of a shorter tick) is added to
+        # land where one TICKRATE tick would. not when it is on the ground
+        # or already falling as fast as it can
+        if self.velocity[1] and self.velocity[1] < self.maxFall:
+            framerMovement = (framerMovement[0], framerMovement[1] + 0.1 * (step * step - step) / 2)
+        # the same for slowing down on x, which is the other way
+        if self.velocity[0] and self.slowdown:
+            slowed = self.slowdown * (step - step * step) / 2
+            framerMovement = (framerMovement[0] + (slowed if self.velocity[0] > 0 else -slowed), framerMovement[1])
 
         # movement for x
-        self.pos[0] += framerMovement[0]
-
-        #creates rect object
-        beingRect = self.rect()
-
-        # if the rect object is colliding with a physicsTile
-        # register collision
-        # check the direction of the collision to do the correct
-        # collision direction
-        for rect in tilemap.physicsRectAround(self.pos):
-            if beingRect.colliderect(rect):
-                if framerMovement[0] >0:    # if collision coming from right
-                    beingRect.right = rect.left
-                    self.collision['right'] = True
-                if framerMovement[0] < 0:
-                    beingRect.left = rect.right #if collision coming from leftside
-                    self.collision['left'] = True
-                #sets postion of rect
-                # using pos[0] because Rect()
-                # only works with int
-                self.pos[0] = beingRect.x
+        # the tilemap sweeps the being's box along the whole movement
+        # and gives back how far (0 to 1) it got before hitting a
+        # physicsTile and which side of the tile it hit. the being is
+        # stopped right against the tile so moving fast (like dashing)
+        # can't skip through a wall. if the being started inside a tile
+        # toi is negative and it is pushed back out of the tile
+        toi, normal = tilemap.sweep(self.pos, self.size, framerMovement[0], 0)
+        if toi < 1:
+            # the tiles are on whole pixals so the position is rounded
+            # to get rid of the float error of the sweep
+            self.pos[0] = round(self.pos[0] + framerMovement[0] * toi)
+            if normal[0] < 0:    # if collision coming from right
+                self.collision['right'] = True
+            else:   #if collision coming from leftside
+                self.collision['left'] = True
+        else:
+            self.pos[0] += framerMovement[0]
 
         # if the entity is moving right don't flip the sprit
         if movement[0] > 0:
@@ -83,21 +106,28 @@ class physicsBeing:
         self.lastMovement = movement
 
         #movement for y
-        self.pos[1] += framerMovement[1]
-        beingRect = self.rect()
-
-        for rect in tilemap.physicsRectAround(self.pos):
-            if beingRect.colliderect(rect):
-                if framerMovement[1] > 0:
-                    beingRect.bottom = rect.top
-                    self.collision['down'] = True
-                if framerMovement[1] <0:
-                    beingRect.top = rect.bottom
-                    self.collision['top'] = True
-                self.pos[1] = beingRect.y
+        # a being standing on the ground has no y velocity so it wouldn't
+        # touch the ground without moving. it is checked one pixal down
+        # instead so it stays on the ground every tick (not every other
+        # tick) no matter how many ticks a second the physics run at
+        if framerMovement[1] == 0:
+            toi, normal = tilemap.sweep(self.pos, self.size, 0, 1)
+            if toi == 0 and normal[1] < 0:
+                self.collision['down'] = True
+            toi = 1
+        else:
+            toi, normal = tilemap.sweep(self.pos, self.size, 0, framerMovement[1])
+        if toi < 1:
+            self.pos[1] = round(self.pos[1] + framerMovement[1] * toi)
+            if normal[1] < 0:
+                self.collision['down'] = True
+            else:
+                self.collision['up'] = True
+        else:
+            self.pos[1] += framerMovement[1]
 
         # This creates gravity, the max value for velocity will be 5
-        self.velocity[1] = min(5, self.velocity[1] + 0.1) 
+        self.velocity[1] = min(5, self.velocity[1] + 0.1 * step) 
 
         # rests the velocity of falling when touch ground or platform
         if self.collision['down'] or self.collision['up']:
@@ -108,11 +138,13 @@ class physicsBeing:
             self.airTime = 0
             self.airTimeThreshold = 0
 
-        self.animation.update()
+        self.animation.update(step)
     
     def render(self, surf, offset=(0,0)):
         # pygame.transform.flip([thing want to flip], flip on x, flip on y)
-        surf.blit(pygame.transform.flip(self.animation.img(), self.flip, False), (self.pos[0] - offset[0] + self.animOffset[0], self.pos[1] - offset[1] + self.animOffset[1]))
+        # the flipped frames come from the transform cache so each
+        # frame is only flipped once instead of every frame
+        surf.blit(transforms.flip(self.animation.img(), self.flip), (self.pos[0] - offset[0] + self.animOffset[0], self.pos[1] - offset[1] + self.animOffset[1]))
         
         # original render 
         # pygame.transform.flip(self.animation.img, self.flip, False)
@@ -130,6 +162,7 @@ class Enemy(physicsBeing):
         self.walking = 0
         
     def update(self, tilemap,movement=(0,0)):
+        step = self.game.timestep.step
         if self.walking:
             # checks if there is a tile infron to of the enemy before walking
             # in both right and left direction
@@ -145,7 +178,7 @@ class Enemy(physicsBeing):
                 self.flip = not self.flip
             # decrements counter caps at 0 i.e self.walking can't be 
             # negative
-            self.walking = max(0, self.walking - 1)
+            self.walking = max(0, self.walking - step)
 
             if not self.walking:
                 distance = (self.game.player.pos[0] - self.pos[0], self.game.player.pos[1] - self.pos[1])
@@ -154,9 +187,8 @@ class Enemy(physicsBeing):
                     # enemy
                     if self.flip and distance[0] < 0: # offset the projectile from the gun
                         # the -1.5 is the direction/speed of the projectile
-                        # and the 0 is the timer for which the projectile has been 
-                        # existing
-                        self.game.projectiles.append([[self.rect().centerx - 7, self.rect().centery, ], -1.5, 0])
+                        projectilePos = (self.rect().centerx - 7, self.rect().centery)
+                        self.game.projectiles.spawn(projectilePos, -1.5)
                         
                         for i in range(4):              
                             # this gives the last created projectile a spark effect in a random direction in the left
@@ -164,21 +196,23 @@ class Enemy(physicsBeing):
                             # go in the left because of the plus 180 degrees
                             # along with a random speed to the spark effect of the projectile
                                                                     # random num from [-0.5, 0.5] + pi
-                            self.game.sparks.append(Spark(self.game.projectiles[-1][0], random.random() - 0.5 + math.pi, 2 + random.random()))
+                            self.game.sparks.emit(projectilePos, random.random() - 0.5 + math.pi, 2 + random.random())
 
                     # checks if the player is to the right of the enmy and fires 
                     # in the right direction if there is a player in range in the 
                     # right directionn
                     if not self.flip and distance[0] > 0:
-                        self.game.projectiles.append([[self.rect().centerx + 7, self.rect().centery], 1.5, 0])
+                        projectilePos = (self.rect().centerx + 7, self.rect().centery)
+                        self.game.projectiles.spawn(projectilePos, 1.5)
                         
                         for i in range(4):
-                            self.game.sparks.append(Spark(self.game.projectiles[-1][0], random.random() - 0.5, 2 + random.random()))
+                            self.game.sparks.emit(projectilePos, random.random() - 0.5, 2 + random.random())
         # if there is no self.walking value
         # then every 1 in a 100 chances 
         # set the value of walking to a number [30,120]
         # randomizes when walking occurs
-        elif random.random() < 0.01:
+        # (the chance is per TICKRATE tick so it is scaled by step too)
+        elif random.random() < 0.01 * step:
             self.walking = random.randint(30,120)
         
 
@@ -191,26 +225,13 @@ class Enemy(physicsBeing):
         else:
             self.setAction('idle')
 
-        # this checks if the player is currently dashing
-        if abs(self.game.player.dashing) > 50:
-
-            # this checks if the player is colliding the the 
-            # enemy while in the dash
-            if self.rect().colliderect(self.game.player.rect()):
-                # adds screenshaking whenever there the enemy is 
-                # hit by the player's dashing
-                self.game.screenshake = max(25, self.game.screenshake)
-                
-                return True
-                
-            
     def render(self, surf, offset=(0,0)):
         super().render(surf, offset=offset)
 
         if self.flip:
             # flips the gun assets on the x - axis only
             # offset the gun by 4 pixals 
-            surf.blit(pygame.transform.flip(self.game.assets['gun'], True, False), (self.rect().centerx - 4 - self.game.assets['gun'].get_width() - offset[0], self.rect().centery - offset[1]))
+            surf.blit(transforms.flip(self.game.assets['gun'], True), (self.rect().centerx - 4 - self.game.assets['gun'].get_width() - offset[0], self.rect().centery - offset[1]))
         else:
             # self.blit(thiing want render, (where to render))
             surf.blit(self.game.assets['gun'], (self.rect().centerx + 4 - offset[0] , self.rect().centery - offset[1]))
@@ -222,22 +243,31 @@ class Player(physicsBeing):
         super().__init__(game, 'player', pos, size)
         self.airTime = 0
         self.airTimeThreshold = 0
+        # input is now read before the first tick so jump() can be
+        # called before update() has set this
+        self.wallSlide = False
 
         self.jumps = 10
         self.dashing = 0
 
     def update(self, tilemap, movement=(0,0)):
+        step = self.game.timestep.step
+        # the dash keeps the x velocity the same until it ends so it
+        # doesn't slow down like a wall jump does
+        self.slowdown = 0 if abs(self.dashing) > 51 else 0.1
         # uses movement method from physicsBeing 
         # but uses the values specific to the player
         super().update(tilemap, movement=movement)
 
         self.wallSlide = False
+        self.maxFall = 5
         # If player is touching the wall from the right or left and in the 
         # air then go into the wall jump animation
         if (self.collision['right'] or self.collision['left']) and (self.velocity[1] > 0):
             self.wallSlide = True
             # caps the vertical velocity at 0.5
             self.velocity[1] = min(self.velocity[1], 0.5)
+            self.maxFall = 0.5
             if self.collision['right']:
                 self.flip = False
             else: 
@@ -245,8 +275,9 @@ class Player(physicsBeing):
             self.setAction('wallSlide')
         
         # generates 20 bursts of particles for the first 
-        # 10 frames of the dash
-        if (self.dashing) in {60, 50}:
+        # 10 frames of the dash. the dash counts down by step so the
+        # second burst is on the first tick it is at 50 or below
+        if self.dashing == 60 or self.dashing <= 50 < self.dashing + step:
             for i in range(20):
                 # generates a random angle from 0 to 2pi
                 angle = random.random() * math.pi * 2
@@ -254,12 +285,12 @@ class Player(physicsBeing):
                 # generates random random particle velocity 
                 # based of random angles & speed of (cos, sin)
                 particleVelocity = [math.cos(angle) * speed, math.sin(angle) * speed]
-                self.game.particles.append(Particle(self.game, 'particle', self.rect().center, velocity=particleVelocity, frame=random.randint(0,7)))
+                self.game.particles.emit('particle', self.rect().center, velocity=particleVelocity, frame=random.randint(0,7))
                 
         if self.dashing > 0:
-            self.dashing = max(0, self.dashing - 1)
+            self.dashing = max(0, self.dashing - step)
         if self.dashing < 0:
-            self.dashing = min(0, self.dashing +1)
+            self.dashing = min(0, self.dashing + step)
         # for the first 10 frames of the dashing
         # change the velocity by a magnitube of 8
         # since abs(self.dashing)/ self.dashing 
@@ -267,19 +298,24 @@ class Player(physicsBeing):
         # that product is * by 8 so the x - axis 
         # velocity is initialize to the + or - 8
         # of the first 10 frames
-        if abs(self.dashing) > 50:
-            self.velocity[0] = abs(self.dashing)/ self.dashing * 8
+        # (the dash counts from 59 so it starts on the same tick
+        # at every rate, not part of a tick early, and ends on the one
+        # tick that takes it to 51 or below. it is a bit less than 8 on
+        # shorter ticks so it is the same 7.9 once it has been slowed
+        # down below)
+        if 51 - step < abs(self.dashing) <= 59:
+            self.velocity[0] = abs(self.dashing)/ self.dashing * (8 - 0.1 * (1 - step))
             # slows down the velocity of the dash 
             # at the end of the 10 frames of the dash
             # the rest of the 50 for the self.dashing 
             # works as a cooldown of 50 frames for the dashing
-            if abs(self.dashing) == 51:
+            if abs(self.dashing) <= 51:
                 self.velocity[0] *= 0.1
 
             # this makes the x - axis particle velocity be from 
             # [-3, 3] and the y-axis particle velocity zero
             particleVelocity = [abs(self.dashing)/self.dashing * random.random() * 3, 0]
-            self.game.particles.append(Particle(self.game, 'particle', self.rect().center, velocity=particleVelocity, frame=random.randint(0,7)))
+            self.game.particles.emit('particle', self.rect().center, velocity=particleVelocity, frame=random.randint(0,7))
         
         if not self.wallSlide:
             # # checks if the player is on the ground
@@ -300,7 +336,7 @@ class Player(physicsBeing):
             # and respawning the player when the player just 
             # barely jumped at all
             if self.velocity[1] != 0:
-                self.airTimeThreshold += 1
+                self.airTimeThreshold += step
                 if self.airTimeThreshold >= 27:
                     self.airTime += 1
                     self.airTimeThreshold = 0
@@ -329,9 +365,9 @@ class Player(physicsBeing):
         # slows down the x - axis velocity depending
         # on which direction the player is moving right or left
         if self.velocity[0] > 0:
-            self.velocity[0] = max(self.velocity[0] - 0.1, 0)
+            self.velocity[0] = max(self.velocity[0] - 0.1 * step, 0)
         else:
-            self.velocity[0] = min(self.velocity[0] + 0.1, 0)
+            self.velocity[0] = min(self.velocity[0] + 0.1 * step, 0)
     
     # this overrides the render method in the parent class 
     # physicBeings with the player child class's render method
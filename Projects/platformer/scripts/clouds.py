@@ -7,8 +7,8 @@ class cloud:
         self.img = img
         self.speed = speed
         self.dept = dept
-    def update(self):
-        self.pos[0] += self.speed
+    def update(self, step=1):
+        self.pos[0] += self.speed * step
 
     # offset is taking consideration of camera
     # surf short for surfance
@@ -35,9 +35,10 @@ class cloudz:
         # sort by the depth
         self.clouds.sort(key=lambda x: x.dept)
 
-    def update(self):
+    # step is how many TICKRATE ticks this tick is worth
+    def update(self, step=1):
         for cloud in self.clouds:
-            cloud.update()
+            cloud.update(step)
 
     def render(self, surf, offset=(0,0)):
         for cloud in self.clouds:
@@ -0,0 +1,105 @@
+import os
+import threading
+import pygame
+from scripts.tilemap import tilemap
+
+# everything about a level that can be worked out before it is played.
+# the tilemap is already filled in and the spawners have been taken
+# out of it so game.loadMap only has to swap it in and make the beings.
+# no images are touched while preparing a level since it runs on the
+# prefetch thread while the main thread is drawing, finishLevel does
+# that part on the main thread
+class preparedLevel:
+    def __init__(self, mapName, tiles, leafSpawner, playerSpawns, enemySpawns):
+        self.mapName = mapName
+        self.tilemap = tiles
+        self.leafSpawner = leafSpawner
+        self.playerSpawns = playerSpawns
+        self.enemySpawns = enemySpawns
+
+# returns the file of the level, the packed .lvl version is used when
+# there is one since it loads much faster than the json. if the json was
+# changed after the .lvl was made the json is used instead so edits to
+# the level are never hidden by an old .lvl
+def levelPath(mapName):
+    path = 'levels/' + str(mapName)
+    packed = path + '.lvl'
+    source = path + '.json'
+    if os.path.exists(packed) and (not os.path.exists(source) or os.path.getmtime(packed) >= os.path.getmtime(source)):
+        return packed
+    return source
+
+def prepareLevel(game, mapName):
+    tiles = tilemap(game, tilesize=16)
+    tiles.load(levelPath(mapName), sizeOffGrid=False)
+
+    leafSpawner = []
+    for tree in tiles.extract([('large_decor', 2)], keep=True):
+        # This looks at every tree so it can determine where to
+        # spawn in the leaves. The leaves will be offsetted a bit
+        # from where the tree actually is
+        leafSpawner.append(pygame.Rect(4 + tree['pos'][0], 4 + tree['pos'][1], 23, 13))
+
+    # 'spawners', 0 is for spawning player
+    # 'spawners', 1 is for spawning enemy
+    playerSpawns = [spawner['pos'] for spawner in tiles.extract([('spawners', 0)])]
+    enemySpawns = [spawner['pos'] for spawner in tiles.extract([('spawners', 1)])]
+    return preparedLevel(mapName, tiles, leafSpawner, playerSpawns, enemySpawns)
+
+# the part of getting a level ready that uses images so it is run on the
+# main thread. loads the images of every tile type in the level now
+# instead of in the middle of the first frames of the level, then sizes
+# the off grid tiles with them
+def finishLevel(game, level):
+    game.assets.preload(level.tilemap.usedTypes())
+    level.tilemap.sizeOffGrid()
+    return level
+
+# gets the next level ready on another thread while the current level is
+# being played so the level transition doesn't have to stop and load it
+class LevelPrefetcher:
+    def __init__(self, game):
+        self.game = game
+        self.mapName = None
+        self.thread = None
+        self.level = None
+        self.error = None
+
+    # starts preparing mapName in the background. nothing is done if
+    # there is no level with that name (like after the last level)
+    def start(self, mapName):
+        if self.mapName == mapName or not os.path.exists(levelPath(mapName)):
+            return
+        # waits for a level that is still being prepared so two
+        # threads are never loading at the same time
+        if self.thread is not None:
+            self.thread.join()
+        self.mapName = mapName
+        self.level = None
+        self.error = None
+        self.thread = threading.Thread(target=self.prepare, args=(mapName,), daemon=True)
+        self.thread.start()
+
+    def prepare(self, mapName):
+        try:
+            self.level = prepareLevel(self.game, mapName)
+        except Exception as error:
+            # the error is raised again on the main thread by take
+            self.error = error
+
+    # returns the prepared level, finished on the calling (main) thread.
+    # if the level wasn't prefetched it is prepared right away. the
+    # prepared level is handed over to the game so it is forgotten here
+    # and can only be taken once
+    def take(self, mapName):
+        if self.mapName == mapName:
+            self.thread.join()
+            level, error = self.level, self.error
+            self.mapName = None
+            self.thread = None
+            self.level = None
+            self.error = None
+            if error is not None:
+                raise error
+            return finishLevel(self.game, level)
+        return finishLevel(self.game, prepareLevel(self.game, mapName))
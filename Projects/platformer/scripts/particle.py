@@ -1,23 +1,137 @@
-class Particle:
-    def __init__(self, game, pType, pos, velocity=[0.0,0.0], frame=0):
+import numpy as np
+
+# particle types that sway side to side as they fall like leaves do
+swayTypes = {'leaf'}
+
+# all of the particles in the game are stored together in numpy arrays
+# (one array for the positions, one for the velocities and so on)
+# instead of one object per particle. this way every particle can be
+# moved and animated with a few array operations each frame and dead
+# particles are removed by moving live ones from the end of the arrays
+# into their slots instead of with list.remove
+class ParticleSystem:
+    def __init__(self, game, capacity=256):
         self.game = game
-        self.type = pType
-        self.pos = list(pos)
-        self.velocity = list(velocity)
-        self.animation = self.game.assets['particle/' + pType].copy()
-        self.animation.frame = frame
-    
-    def update(self):
-        kill = False
-        if self.animation.done:
-            kill = True
-        self.pos[0] += self.velocity[0]
-        self.pos[1] += self.velocity[1]
-
-        self.animation.update()
-
-        return kill
-    
+        # number of live particles. the live particles are always
+        # at the front of the arrays in [0, count)
+        self.count = 0
+
+        self.pos = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        # frames are floats since the animations move forward by step
+        self.frame = np.zeros(capacity)
+        # index of the particle's type in the type tables below
+        self.kind = np.zeros(capacity, dtype=np.int32)
+        # done is set once the animation has played through. like the old
+        # Particle class the particle is drawn for one more frame after
+        # that and dying marks the particles to remove at the next update
+        self.done = np.zeros(capacity, dtype=bool)
+        self.dying = np.zeros(capacity, dtype=bool)
+
+        # tables with one entry per particle type, filled in the first
+        # time a type is emitted from the game's 'particle/' animations.
+        # every frame of every type goes into one flat list so a particle's
+        # image is frames[frameBase[kind] + frame // imgDur[kind]]
+        self.kinds = {}
+        self.frames = []
+        self.halfSizes = np.zeros((0, 2))
+        self.frameBase = np.zeros(0, dtype=np.int32)
+        self.imgDur = np.zeros(0, dtype=np.int32)
+        self.length = np.zeros(0, dtype=np.int32)
+        self.loop = np.zeros(0, dtype=bool)
+        self.sway = np.zeros(0, dtype=bool)
+
+    # returns the index of the particle type in the type tables
+    def kindOf(self, pType):
+        kind = self.kinds.get(pType)
+        if kind is None:
+            anim = self.game.assets['particle/' + pType]
+            kind = len(self.kinds)
+            self.kinds[pType] = kind
+            self.frameBase = np.append(self.frameBase, len(self.frames))
+            self.imgDur = np.append(self.imgDur, anim.imgDur)
+            self.length = np.append(self.length, anim.length)
+            self.loop = np.append(self.loop, anim.loop)
+            self.sway = np.append(self.sway, pType in swayTypes)
+            self.frames.extend(anim.images)
+            # the images are drawn centered on the particle's position
+            self.halfSizes = np.append(self.halfSizes, [(img.get_width()//2, img.get_height()//2) for img in anim.images], axis=0)
+        return kind
+
+    # doubles the size of every array when the pool is full
+    def grow(self):
+        capacity = len(self.frame) * 2
+        for name in ('pos', 'velocity', 'frame', 'kind', 'done', 'dying'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    # adds a particle of type pType ('leaf' or 'particle')
+    def emit(self, pType, pos, velocity=(0.0, 0.0), frame=0):
+        if self.count == len(self.frame):
+            self.grow()
+        i = self.count
+        self.pos[i] = pos
+        self.velocity[i] = velocity
+        self.frame[i] = frame
+        self.kind[i] = self.kindOf(pType)
+        self.done[i] = False
+        self.dying[i] = False
+        self.count += 1
+
+    # removes every particle
+    def clear(self):
+        self.count = 0
+
+    # removes the particles marked in the dead mask by moving the live
+    # particles from the end of the arrays into the slots of the dead
+    # ones so only the particles that died have to be moved
+    def compact(self, dead):
+        alive = ~dead
+        newCount = int(alive.sum())
+        holes = np.flatnonzero(dead[:newCount])
+        movers = np.flatnonzero(alive[newCount:]) + newCount
+        for arr in (self.pos, self.velocity, self.frame, self.kind, self.done, self.dying):
+            arr[holes] = arr[movers]
+        self.count = newCount
+
+    # step is how many TICKRATE ticks this tick is worth
+    def update(self, step=1):
+        # removes the particles that finished their animation
+        # and were drawn one last time in the last frame
+        if self.dying[:self.count].any():
+            self.compact(self.dying[:self.count])
+        n = self.count
+        if not n:
+            return
+
+        self.dying[:n] = self.done[:n]
+        self.pos[:n] += self.velocity[:n] * step
+
+        # moves the animation of every particle forward by step frames.
+        # looping animations wrap back to the start while the others
+        # stop on their last frame and are marked as done
+        kind = self.kind[:n]
+        length = self.length[kind]
+        loop = self.loop[kind]
+        frame = self.frame[:n] + step
+        frame = np.where(loop, frame % length, np.minimum(frame, length - 1))
+        self.frame[:n] = frame
+        self.done[:n] |= ~loop & (frame >= length - 1)
+
+        # leaves sway left and right as they fall
+        sway = self.sway[kind]
+        if sway.any():
+            self.pos[:n, 0] += np.where(sway, np.sin(frame * 0.035) * 0.3 * step, 0)
+
     def render(self, surf, offset=(0,0)):
-        img = self.animation.img()
-        surf.blit(img, (self.pos[0] - offset[0] - img.get_width()//2 , self.pos[1] - offset[1] - img.get_height()//2))
\ No newline at end of file
+        n = self.count
+        if not n:
+            return
+        kind = self.kind[:n]
+        img = self.frameBase[kind] + (self.frame[:n] // self.imgDur[kind]).astype(np.int32)
+        renderPos = self.pos[:n] - offset - self.halfSizes[img]
+        frames = self.frames
+        # draws every particle with a single call
+        surf.blits([(frames[i], p) for i, p in zip(img.tolist(), renderPos.tolist())], doreturn=False)
@@ -0,0 +1,114 @@
+import math
+import random
+import numpy as np
+
+# how many TICKRATE ticks a projectile lasts before it disappears (6 seconds)
+PROJECTILELIFE = 360
+
+# all of the enemy projectiles are kept in a fixed size pool of numpy
+# arrays. every projectile is moved, aged and checked against the
+# tiles and the player at the same time. the live projectiles are
+# always at the front of the arrays and when one is removed the last
+# live projectile is moved into its slot
+class ProjectileSystem:
+    def __init__(self, game, capacity=1024):
+        self.game = game
+        self.count = 0
+        self.pos = np.zeros((capacity, 2))
+        # how many pixals the projectile moves each frame, negative is left
+        self.direction = np.zeros(capacity)
+        # number of TICKRATE ticks the projectile has existed
+        self.age = np.zeros(capacity)
+
+    def __len__(self):
+        return self.count
+
+    # fires a projectile from pos. if the pool is full the shot is
+    # dropped and False is returned
+    def spawn(self, pos, direction):
+        if self.count == len(self.age):
+            return False
+        i = self.count
+        self.pos[i] = pos
+        self.direction[i] = direction
+        self.age[i] = 0
+        self.count += 1
+        return True
+
+    # removes every projectile
+    def clear(self):
+        self.count = 0
+
+    # removes the projectiles in the mask by moving the live projectiles
+    # from the end of the pool into the empty slots
+    def remove(self, dead):
+        alive = ~dead
+        newCount = int(alive.sum())
+        holes = np.flatnonzero(dead[:newCount])
+        movers = np.flatnonzero(alive[newCount:]) + newCount
+        for arr in (self.pos, self.direction, self.age):
+            arr[holes] = arr[movers]
+        self.count = newCount
+
+    # step is how many TICKRATE ticks this tick is worth
+    def update(self, step=1):
+        n = self.count
+        if not n:
+            return
+        game = self.game
+        pos = self.pos[:n]
+        direction = self.direction[:n]
+
+        # giving movement to the projectile
+        # according to its direction
+        pos[:, 0] += direction * step
+        self.age[:n] += step
+
+        # checks if the projectiles are hiting a solid thing
+        # with one look up for all of them
+        hitWall = game.tilemap.solidAtMany(pos)
+        # if the projectile has existed 360 frames or 6 seconds
+        # delete it
+        expired = ~hitWall & (self.age[:n] > PROJECTILELIFE)
+
+        # the player can only be hit while not dashing. instead of checking
+        # the player's rect against each projectile, the positions of all of
+        # them are compared with the edges of the rect at once
+        hitPlayer = np.zeros(n, dtype=bool)
+        if abs(game.player.dashing) < 50:
+            playerRect = game.player.rect()
+            hitPlayer = ~hitWall & ~expired & (pos[:, 0] >= playerRect.left) & (pos[:, 0] < playerRect.right) & (pos[:, 1] >= playerRect.top) & (pos[:, 1] < playerRect.bottom)
+
+        for i in np.flatnonzero(hitWall):
+            for j in range(4):
+                # projectile direction is used so the spark effects go left if
+                # projectile moves right making an bouncing effect
+                # random.random() range of [0,1] so 2 + random.random() is [2,3]
+                game.sparks.emit(pos[i], random.random() - 0.5 + (math.pi if direction[i] > 0 else 0), 2 + random.random())
+
+        for i in np.flatnonzero(hitPlayer):
+            game.dead += 1
+            game.screenshake = max(25, game.screenshake)
+            for j in range(30):
+                # gives random angle in 360 degree circle
+                angle = random.random() * math.pi * 2
+                # random speed
+                speed = random.random() * 5
+                # creates spark effects when hitting the player
+                game.sparks.emit(game.player.rect().center, angle, 2 + random.random())
+                # makes a particle effect that goes off in opposite direction to spark when hiting the player
+                # + math.pi makes the particle shoot off in different direction to the spark
+                game.particles.emit('particle', game.player.rect().center, velocity=[math.cos(angle + math.pi) * speed * 0.5, math.sin(angle + math.pi) * speed * 0.5])
+
+        dead = hitWall | expired | hitPlayer
+        if dead.any():
+            self.remove(dead)
+
+    def render(self, surf, offset=(0,0)):
+        n = self.count
+        if not n:
+            return
+        img = self.game.assets['projectile']
+        # centers the image of the projectile
+        renderPos = self.pos[:n] - offset - (img.get_width() / 2, img.get_height() / 2)
+        surf.blits([(img, p) for p in renderPos.tolist()], doreturn=False)
@@ -1,28 +1,104 @@
 import math
+import numpy as np
 import pygame
 
-class Spark:
-    def __init__(self, pos, angle, speed):
-        self.pos = list(pos)
-        self.angle = angle
-        self.speed = speed
-    
-    def update(self):
-        self.pos[0] += math.cos(self.angle) * self.speed
-        self.pos[1] += math.sin(self.angle) * self.speed
+# all of the sparks in the game are stored together in numpy arrays
+# so they can all be moved and have their shapes worked out at once
+# instead of doing the math for each spark one by one.
+# a spark that dies frees up its slot in the arrays which gets put on a
+# free list so the next spark can reuse it without moving anything around
+class SparkField:
+    def __init__(self, capacity=128):
+        self.pos = np.zeros((capacity, 2))
+        # the direction of the spark (cos(angle), sin(angle)) is worked
+        # out once when the spark is made since the angle never changes
+        self.direction = np.zeros((capacity, 2))
+        self.speed = np.zeros(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+        # sparks are drawn one last time in the frame their speed runs
+        # out and dying marks them to be freed at the next update
+        self.dying = np.zeros(capacity, dtype=bool)
+        # slots below top have been used before. free holds the ones in
+        # there that are not being used right now
+        self.top = 0
+        self.free = []
 
-        self.speed = max(0, self.speed - 1)
-        return not self.speed
+    def __len__(self):
+        return self.top - len(self.free)
+
+    # doubles the size of every array when every slot is taken
+    def grow(self):
+        capacity = len(self.speed) * 2
+        for name in ('pos', 'direction', 'speed', 'alive', 'dying'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    # adds a spark at pos flying off at the angle (in radians)
+    def emit(self, pos, angle, speed):
+        if self.free:
+            i = self.free.pop()
+        else:
+            if self.top == len(self.speed):
+                self.grow()
+            i = self.top
+            self.top += 1
+        self.pos[i] = pos
+        self.direction[i] = (math.cos(angle), math.sin(angle))
+        self.speed[i] = speed
+        self.alive[i] = True
+        self.dying[i] = False
+
+    # removes every spark
+    def clear(self):
+        self.alive[:self.top] = False
+        self.dying[:self.top] = False
+        self.top = 0
+        self.free = []
+
+    # step is how many TICKRATE ticks this tick is worth
+    def update(self, step=1):
+        top = self.top
+        # frees the slots of the sparks that were drawn for the last time
+        dead = np.flatnonzero(self.dying[:top])
+        if len(dead):
+            self.alive[dead] = False
+            self.dying[dead] = False
+            if not self.alive[:top].any():
+                # every spark is gone so the whole pool can start over
+                self.top = 0
+                self.free = []
+                return
+            self.free.extend(dead.tolist())
+
+        alive = self.alive[:top]
+        speed = self.speed[:top]
+        # moves every spark along its direction then slows it down
+        self.pos[:top] += self.direction[:top] * (speed * alive * step)[:, None]
+        speed[alive] = np.maximum(0, speed[alive] - step)
+        self.dying[:top] = alive & (speed == 0)
 
     def render(self, surf, offset=(0,0)):
-        renderPoints = [
-            # this is the spark effect for infront of the sprite
-            (self.pos[0] + math.cos(self.angle) * self.speed * 3 - offset[0], self.pos[1] + math.sin(self.angle) * self.speed * 3 - offset[1]),
-            # this is the spark effect up 90 degrees
-            (self.pos[0] + math.cos(self.angle + math.pi * 0.5) * self.speed * 0.5 - offset[0], self.pos[1] + math.sin(self.angle + math.pi * 0.5) * 0.5 - offset[1]),
-            # this is the spark effect 180 degrees 
-            (self.pos[0] + math.cos(self.angle + math.pi) * self.speed * 3 - offset[0], self.pos[1] + math.sin(self.angle + math.pi) * self.speed * 3 - offset[1]),
-            # this is the spark effect at 270 degrees
-            (self.pos[0] + math.cos(self.angle - math.pi * 0.5) * self.speed * 0.5 -offset[0], self.pos[1] * math.sin(self.angle - math.pi * 0.5) * self.speed * 0.5 - offset[1])
-        ]
-        pygame.draw.polygon(surf, (255, 255, 255), renderPoints)
\ No newline at end of file
+        live = np.flatnonzero(self.alive[:self.top])
+        if not len(live):
+            return
+        pos = self.pos[live] - offset
+        speed = self.speed[live][:, None]
+        direction = self.direction[live]
+        # the side of the spark is the direction turned by 90 degrees
+        side = direction[:, ::-1] * (-1, 1)
+
+        # works out the 4 points of every spark's diamond shape at once
+        renderPoints = np.empty((len(live), 4, 2))
+        # this is the spark effect for infront of the sprite
+        renderPoints[:, 0] = pos + direction * speed * 3
+        # this is the spark effect up 90 degrees
+        renderPoints[:, 1] = pos + side * speed * 0.5
+        # this is the spark effect 180 degrees
+        renderPoints[:, 2] = pos - direction * speed * 3
+        # this is the spark effect at 270 degrees
+        renderPoints[:, 3] = pos - side * speed * 0.5
+
+        for points in renderPoints.tolist():
+            pygame.draw.polygon(surf, (255, 255, 255), points)
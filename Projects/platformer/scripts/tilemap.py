@@ -1,23 +1,29 @@
 import json
+import math
+import numpy as np
 import pygame
+from shared import levelFormat
+
+# every side of a tile gets its own bit so the neighbors of a tile
+# with the same type can be stored as a single number from 0 to 15
+# (1,0) is right, (-1,0) is left, (0,-1) is up and (0,1) is down
+autoTileBits = [((1,0), 1), ((-1,0), 2), ((0,-1), 4), ((0,1), 8)]
+
+# the index is the bitmask of the neighbors and the value is the
+# variant of tile to use. -1 means that arrangement of neighbors
+# has no variant so the tile is left the way it is
+autoTileMap = [-1] * 16
+#           neighbors          variant of tile
+autoTileMap[1 | 8]         = 0 # right, down
+autoTileMap[1 | 2]         = 1 # right, left
+autoTileMap[8 | 2]         = 2 # down, left
+autoTileMap[8 | 2 | 4]     = 3 # down, left, up
+autoTileMap[2 | 4]         = 4 # left, up
+autoTileMap[2 | 4 | 1]     = 5 # left, up, right
+autoTileMap[8 | 4]         = 6 # down, up
+autoTileMap[1 | 4 | 8]     = 7 # right, up, down
+autoTileMap[1 | 2 | 4 | 8] = 8 # all four sides
 
-# the key is a sorted array to ensure that no matter what the 
-# order of coordinates used it will be matched with the same thing
-# also the sorted list is converted to a tuple because 
-# an array can't be a key for a map while a tuple can
-autoTileMap = {
-    # position    variant of tile
-    tuple(sorted([(1,0), (0,1)])): 0,
-    tuple(sorted([(1,0), (-1,0)])): 1,
-    tuple(sorted([(0,1), (-1,0)])): 2,
-    tuple(sorted([(0,1),(-1,0),(0,-1)])): 3,
-    tuple(sorted([(-1,0),(0,-1)])): 4,
-    tuple(sorted([(-1,0),(0,-1),(1,0)])): 5,
-    tuple(sorted([(0,1), (0,-1)])): 6,
-    tuple(sorted([(1,0), (0,-1), (0,1)])):7,
-    tuple(sorted([(1,0), (-1,0), (0,1), (0,-1)])): 8
-
-}
 # this list contains all the possible offset of coordinates
 # around a pixal
 neighborOffSet = [(-1,0), (-1,-1), (0,-1), (1,-1), (1,0),(0,0), (-1,1),(0,1),(1,1)]
@@ -27,56 +33,440 @@ neighborOffSet = [(-1,0), (-1,-1), (0,-1), (1,-1), (1,0),(0,0), (-1,1),(0,1),(1,
 physicTiles = {'grass','stone'}
 autoTileType = {'grass', 'stone'}
 
+# the map is split up into square chunks of 16 x 16 tiles
+# CHUNKSHIFT is log2 of the chunk size so x >> CHUNKSHIFT gives
+# the chunk a tile is in and x & CHUNKMASK gives the column of the
+# tile inside of that chunk. shifting and masking also work for
+# negative tile coordinates unlike int division
+CHUNKSIZE = 16
+CHUNKSHIFT = 4
+CHUNKMASK = CHUNKSIZE - 1
+
+# chunks are stored in a dictionary keyed by a single integer
+# (cx << CHUNKKEYSHIFT) + cy instead of an 'x;y' string so
+# looking up a chunk never has to build and hash a new string
+CHUNKKEYSHIFT = 16
+
+def chunkKey(cx, cy):
+    return (cx << CHUNKKEYSHIFT) + cy
+
+# a chunk holds the tiles of a 16 x 16 area of the map in two flat
+# byte arrays. types holds the type id of every cell (0 means there
+# is no tile there) and variants holds the variant of every cell.
+# the cell of tile (x, y) is at index (y & CHUNKMASK) * CHUNKSIZE + (x & CHUNKMASK)
+class chunk:
+    __slots__ = ('cx', 'cy', 'types', 'variants', 'count', 'surf', 'overflow', 'dirty')
+
+    def __init__(self, cx, cy):
+        self.cx = cx
+        self.cy = cy
+        self.types = bytearray(CHUNKSIZE * CHUNKSIZE)
+        self.variants = bytearray(CHUNKSIZE * CHUNKSIZE)
+        # number of cells that have a tile so empty chunks can be dropped
+        self.count = 0
+        # all of the tiles in the chunk pre rendered onto one surface
+        # so render can draw the whole chunk with a single blit.
+        # tiles whose image is bigger than a tile would get cut off at
+        # the edge of the chunk so they are kept in overflow and drawn
+        # on their own instead. dirty is set whenever a tile in the
+        # chunk changes so the surface is rebuilt the next time it is drawn
+        self.surf = None
+        self.overflow = []
+        self.dirty = True
+
+# the off grid tiles are put into a uniform grid of 64 x 64 pixal
+# cells so render and the level editor only have to look at the
+# tiles in the cells they care about instead of every single one
+OFFGRIDCELL = 64
+
+# this is a spatial hash for the off grid tiles. every tile gets an id
+# in the order it was added and is put into every cell its image covers.
+# tiles holds the tiles by id so they can still be gone through in the
+# order they were placed, which is also the order they are drawn in
+class offGridIndex:
+    def __init__(self, cellSize=OFFGRIDCELL):
+        self.cellSize = cellSize
+        # cell key -> list of ids of the tiles in that cell
+        self.cells = {}
+        # id -> tile and id -> (left, top, right, bottom) in pixals
+        self.tiles = {}
+        self.bounds = {}
+        # (type, variant) -> ids of the tiles of that kind so a kind
+        # of tile can be found without going through every tile
+        self.kinds = {}
+        self.nextId = 0
+
+    def __len__(self):
+        return len(self.tiles)
+
+    # gives back the key of every cell the box covers
+    def cellKeys(self, left, top, right, bottom):
+        for cx in range(int(left // self.cellSize), int(right // self.cellSize) + 1):
+            for cy in range(int(top // self.cellSize), int(bottom // self.cellSize) + 1):
+                yield chunkKey(cx, cy)
+
+    # adds a tile whose image is size pixals big and returns its id
+    def add(self, tile, size):
+        tileId = self.nextId
+        self.nextId += 1
+        box = (tile['pos'][0], tile['pos'][1], tile['pos'][0] + size[0], tile['pos'][1] + size[1])
+        self.tiles[tileId] = tile
+        self.bounds[tileId] = box
+        self.kinds.setdefault((tile['type'], tile['variant']), {})[tileId] = None
+        for key in self.cellKeys(*box):
+            self.cells.setdefault(key, []).append(tileId)
+        return tileId
+
+    def remove(self, tileId):
+        tile = self.tiles.pop(tileId)
+        for key in self.cellKeys(*self.bounds.pop(tileId)):
+            cell = self.cells[key]
+            cell.remove(tileId)
+            if not cell:
+                del self.cells[key]
+        kind = (tile['type'], tile['variant'])
+        del self.kinds[kind][tileId]
+        if not self.kinds[kind]:
+            del self.kinds[kind]
+        return tile
+
+    # returns the ids of the tiles that overlap the pygame.Rect
+    # sorted in the order they were added so they are drawn the
+    # same way as before
+    def query(self, rect):
+        found = set()
+        for key in self.cellKeys(rect.left, rect.top, rect.right, rect.bottom):
+            cell = self.cells.get(key)
+            if cell:
+                found.update(cell)
+        match = []
+        for tileId in found:
+            box = self.bounds[tileId]
+            if box[0] < rect.right and box[2] > rect.left and box[1] < rect.bottom and box[3] > rect.top:
+                match.append(tileId)
+        match.sort()
+        return match
+
+    # returns the ids of the tiles whose image covers the point
+    def queryPoint(self, pos):
+        match = []
+        for tileId in self.cells.get(chunkKey(int(pos[0] // self.cellSize), int(pos[1] // self.cellSize)), ()):
+            box = self.bounds[tileId]
+            if box[0] <= pos[0] < box[2] and box[1] <= pos[1] < box[3]:
+                match.append(tileId)
+        return match
+
 class tilemap:
     def __init__ (self, game, tilesize=16):
         self.game = game
         self.tileSize = tilesize
-        # using a dictionary for title mapping because 
+        # using a dictionary of chunks for title mapping because
         # don't have to fill in every single tile if want 
         # two islands far apart from each other
-        self.tilemap = {}
-        self.offGridT = []
+        self.chunks = {}
+
+        # tile types are stored in the chunks as small integer ids
+        # typeNames turns an id back into the name used in self.game.assets
+        # and the level files. id 0 is saved for empty cells
+        self.typeNames = [None]
+        self.typeIds = {}
+        # solidIds[typeId] is 1 if that type of tile has physics
+        # so collision checks don't have to compare any strings
+        # and autoTileIds[typeId] is 1 if that type gets auto tiled
+        self.solidIds = bytearray(256)
+        self.autoTileIds = bytearray(256)
+
+        # (type id, variant) -> the grid positions of every tile of that
+        # kind. it is kept up to date whenever a tile is placed, changed
+        # or deleted so extract only looks at the tiles it is asked for.
+        # the positions are the keys of a dictionary so they stay in the
+        # order they were added and can be removed right away
+        self.kindIndex = {}
+
+        # physicsRectsIn hands out rects from this pool instead of making
+        # new pygame.Rect objects every time an entity moves. physicsHits
+        # is the list it fills in and returns which is also reused
+        self.rectPool = [pygame.Rect(0, 0, tilesize, tilesize) for i in range(16)]
+        self.physicsHits = []
+        # the area sweep looks for tiles in, also reused every call
+        self.sweepRect = pygame.Rect(0, 0, 0, 0)
+
+        # a numpy grid of which cells are solid covering every chunk in
+        # the map so solidAtMany can check lots of points at once.
+        # solidOrigin is the tile in the top left corner of the grid.
+        # the grid is only built again after a tile has changed
+        self.solidGrid = None
+        self.solidOrigin = (0, 0)
+
+        # the off grid tiles are kept in a spatial hash so only the
+        # ones on the screen have to be drawn
+        self.offGridT = offGridIndex()
+
+    # returns the id of a tile type and gives the type
+    # a new id if it has never been seen before
+    def typeId(self, tType):
+        tId = self.typeIds.get(tType)
+        if tId is None:
+            tId = len(self.typeNames)
+            self.typeNames.append(tType)
+            self.typeIds[tType] = tId
+            if tType in physicTiles:
+                self.solidIds[tId] = 1
+            if tType in autoTileType:
+                self.autoTileIds[tId] = 1
+        return tId
+
+    # adds or removes the grid tile at (x, y) in the kind index
+    def indexTile(self, tId, variant, x, y):
+        self.kindIndex.setdefault((tId, variant), {})[(x, y)] = None
+
+    def unindexTile(self, tId, variant, x, y):
+        positions = self.kindIndex[(tId, variant)]
+        del positions[(x, y)]
+        if not positions:
+            del self.kindIndex[(tId, variant)]
+
+    # places a tile at the grid position (x, y)
+    # replacing whatever tile was there before
+    # returns True if the tile at (x, y) changed
+    # if autoTile is True the tile and its 4 neighbors are auto tiled
+    # right away like when painting in the level editor
+    def setTile(self, x, y, tType, variant, autoTile=False):
+        key = chunkKey(x >> CHUNKSHIFT, y >> CHUNKSHIFT)
+        tChunk = self.chunks.get(key)
+        if tChunk is None:
+            tChunk = chunk(x >> CHUNKSHIFT, y >> CHUNKSHIFT)
+            self.chunks[key] = tChunk
+        i = ((y & CHUNKMASK) << CHUNKSHIFT) | (x & CHUNKMASK)
+        tId = self.typeId(tType)
+        # the editor places the same tile every frame while the mouse is
+        # held down so nothing is changed if the tile is already there.
+        # an auto tiled tile has had its variant picked for it so it
+        # only counts as already there if the type is the same
+        if tChunk.types[i] == tId and (tChunk.variants[i] == variant or (autoTile and self.autoTileIds[tId])):
+            return False
+        if not tChunk.types[i]:
+            tChunk.count += 1
+        else:
+            self.unindexTile(tChunk.types[i], tChunk.variants[i], x, y)
+        self.indexTile(tId, variant, x, y)
+        tChunk.types[i] = tId
+        tChunk.variants[i] = variant
+        tChunk.dirty = True
+        self.solidGrid = None
+        if autoTile:
+            self.autoTileAround(x, y)
+        return True
+
+    # deletes the tile at the grid position (x, y)
+    # returns True if there was a tile there to delete
+    # if autoTile is True the 4 neighbors of the tile are auto tiled again
+    def removeTile(self, x, y, autoTile=False):
+        key = chunkKey(x >> CHUNKSHIFT, y >> CHUNKSHIFT)
+        tChunk = self.chunks.get(key)
+        if tChunk is None:
+            return False
+        i = ((y & CHUNKMASK) << CHUNKSHIFT) | (x & CHUNKMASK)
+        if not tChunk.types[i]:
+            return False
+        self.unindexTile(tChunk.types[i], tChunk.variants[i], x, y)
+        tChunk.types[i] = 0
+        tChunk.variants[i] = 0
+        tChunk.count -= 1
+        tChunk.dirty = True
+        self.solidGrid = None
+        # drops the chunk once it is empty so render and
+        # extract don't have to look through it anymore
+        if not tChunk.count:
+            del self.chunks[key]
+        if autoTile:
+            self.autoTileAround(x, y)
+        return True
+
+    # adds a tile that is not on the grid. its position is in pixals
+    # and the size of its image is needed to know which cells it covers.
+    # the game doesn't load the spawner images since the spawners are
+    # extracted before anything is drawn so those count as one tile big
+    # sized is False when the images can't be used yet (like on the level
+    # prefetch thread). the tile is indexed as one tile big until
+    # sizeOffGrid is called
+    def addOffGrid(self, tile, sized=True):
+        if sized and tile['type'] in self.game.assets:
+            size = self.game.assets[tile['type']][tile['variant']].get_size()
+        else:
+            size = (self.tileSize, self.tileSize)
+        return self.offGridT.add(tile, size)
+
+    # deletes every off grid tile whose image is under the pixal position
+    # and gives back the tiles that were deleted
+    def removeOffGridAt(self, pos):
+        removed = []
+        for tileId in self.offGridT.queryPoint(pos):
+            removed.append(self.offGridT.tiles[tileId])
+            self.offGridT.remove(tileId)
+        return removed
+
+    # returns the off grid tiles that overlap the pygame.Rect in pixals
+    def offGridIn(self, rect):
+        return [self.offGridT.tiles[tileId] for tileId in self.offGridT.query(rect)]
+
+    # returns the type id of the tile at the grid position (x, y)
+    # or 0 if there is no tile there
+    def tileTypeAt(self, x, y):
+        tChunk = self.chunks.get(((x >> CHUNKSHIFT) << CHUNKKEYSHIFT) + (y >> CHUNKSHIFT))
+        if tChunk is None:
+            return 0
+        return tChunk.types[((y & CHUNKMASK) << CHUNKSHIFT) | (x & CHUNKMASK)]
+
+    # returns the tile at the grid position (x, y) in the same
+    # dictionary format that is used in the level files
+    # or None if there is no tile there
+    def getTile(self, x, y):
+        tChunk = self.chunks.get(chunkKey(x >> CHUNKSHIFT, y >> CHUNKSHIFT))
+        if tChunk is None:
+            return None
+        i = ((y & CHUNKMASK) << CHUNKSHIFT) | (x & CHUNKMASK)
+        if not tChunk.types[i]:
+            return None
+        return {'type': self.typeNames[tChunk.types[i]], 'variant': tChunk.variants[i], 'pos': [x, y]}
+
+    # goes through every tile in the map and gives back
+    # (x, y, type id, variant) for each of them
+    def tiles(self):
+        for tChunk in self.chunks.values():
+            baseX = tChunk.cx << CHUNKSHIFT
+            baseY = tChunk.cy << CHUNKSHIFT
+            types = tChunk.types
+            for i in range(CHUNKSIZE * CHUNKSIZE):
+                if types[i]:
+                    yield baseX + (i & CHUNKMASK), baseY + (i >> CHUNKSHIFT), types[i], tChunk.variants[i]
+
+    # returns the name of every tile type in the map so the
+    # game can load those images before the level starts
+    def usedTypes(self):
+        types = {self.typeNames[tId] for tId, variant in self.kindIndex}
+        types.update(tType for tType, variant in self.offGridT.kinds)
+        return types
+
     def save(self,path):
+        # .lvl files are saved in the packed binary format
+        if path.endswith('.lvl'):
+            levelFormat.save(path, self.levelData())
+            return
+        # the chunks are turned back into the 'x;y' string keyed
+        # dictionary so the level files stay the same as before
+        tiles = {}
+        for x, y, tId, variant in self.tiles():
+            tiles[str(x) + ';' + str(y)] = {'type': self.typeNames[tId], 'variant': variant, 'pos': [x, y]}
         # open the file
         # 'w' stands for write in the file
         f = open(path, 'w') 
         # dump the map into the file as json
-        json.dump({'tilemap':self.tilemap, 'tileSize': self.tileSize, 'offgrid':self.offGridT},f)
+        json.dump({'tilemap':tiles, 'tileSize': self.tileSize, 'offgrid':list(self.offGridT.tiles.values())},f)
         f.close()
 
     # This method will find all of the tiles in the level that have the same
     # id Pair as then one passed into the function 
     # so if you called extract and passed in large_decor as the id pair
     # then this method will find all of the large_decor tiles in the map 
-    # and make a copy of all of them in a list called matches and return it 
+    # and make a copy of all of them in a list called matches and return it.
+    # the tiles are looked up in the kind indexes so only the tiles that
+    # match are looked at instead of every tile in the map
     def extract(self, idPair, keep=False):
         match = []
-        # make a copy because might want to remove the 
-        # tile from the list later so don't want to actually delete
-        # the tile 
-        for tile in self.offGridT.copy():
-            if (tile['type'], tile['variant']) in idPair:
-                match.append(tile.copy())
-                if not keep:
-                    self.offGridT.remove(tile)
-    
-        # made a copy of the spawners so don't disrupt ths 
-        # size of the dictionary while running 
-        for loc in list(self.tilemap):
-            tile = self.tilemap[loc]
-            if (tile['type'], tile['variant']) in idPair:
-                match.append(tile.copy())
-                # made a deep copy of tile data and 
+        # each kind is only looked up once even if it is passed in twice
+        kinds = list(dict.fromkeys(tuple(pair) for pair in idPair))
+
+        # the off grid tiles are returned in the order they were placed
+        offGridIds = []
+        for kind in kinds:
+            offGridIds.extend(self.offGridT.kinds.get(kind, ()))
+        offGridIds.sort()
+        for tileId in offGridIds:
+            match.append(self.offGridT.tiles[tileId].copy())
+            if not keep:
+                self.offGridT.remove(tileId)
+
+        for tType, variant in kinds:
+            positions = self.kindIndex.get((self.typeIds.get(tType), variant))
+            if not positions:
+                continue
+            # made a copy of the positions so removing the tiles
+            # doesn't change the index while looking through it
+            for x, y in list(positions):
                 # converted to pixal coordinates
-                match[-1]['pos'] = match[-1]['pos'].copy()
-                match[-1]['pos'][0] *= self.tileSize
-                match[-1]['pos'][1] *= self.tileSize
+                match.append({'type': tType, 'variant': variant, 'pos': [x * self.tileSize, y * self.tileSize]})
                 if not keep:
-                    del self.tilemap[loc]
+                    self.removeTile(x, y)
 
         return match
     
-    def load(self,path):
+    # packs the map into the arrays of the binary level format
+    def levelData(self):
+        tiles = list(self.tiles())
+        offGrid = list(self.offGridT.tiles.values())
+        # the file has its own list of the types that are in the level
+        names = sorted(self.usedTypes())
+        index = {name: i for i, name in enumerate(names)}
+        grid = ([tile[0] for tile in tiles],
+                [tile[1] for tile in tiles],
+                [index[self.typeNames[tile[2]]] for tile in tiles],
+                [tile[3] for tile in tiles])
+        off = ([tile['pos'][0] for tile in offGrid],
+               [tile['pos'][1] for tile in offGrid],
+               [index[tile['type']] for tile in offGrid],
+               [tile['variant'] for tile in offGrid])
+        return levelFormat.LevelData(self.tileSize, names, grid, off)
+
+    # fills the map in from a level in the binary format. the grid tiles
+    # are sorted into their chunks with numpy instead of one at a time.
+    # the arrays of the level are memoryviews of the file which numpy
+    # can use as they are without copying them
+    def loadLevel(self, level, sizeOffGrid=True):
+        self.chunks = {}
+        self.kindIndex = {}
+        self.solidGrid = None
+        if len(level.gridX):
+            # turns the type numbers of the file into the ids of this tilemap
+            tIds = np.array([self.typeId(name) for name in level.typeNames], dtype=np.uint8)[np.asarray(level.gridType)]
+            x = np.asarray(level.gridX).astype(np.int64)
+            y = np.asarray(level.gridY).astype(np.int64)
+            keys = ((x >> CHUNKSHIFT) << CHUNKKEYSHIFT) + (y >> CHUNKSHIFT)
+            cells = ((y & CHUNKMASK) << CHUNKSHIFT) | (x & CHUNKMASK)
+            variants = np.asarray(level.gridVariant).astype(np.uint8)
+
+            # puts the tiles of each chunk next to each other
+            order = np.argsort(keys, kind='stable')
+            starts = np.flatnonzero(np.diff(keys[order], prepend=keys[order[0]] - 1))
+            for start, end in zip(starts.tolist(), starts[1:].tolist() + [len(order)]):
+                group = order[start:end]
+                first = group[0]
+                tChunk = chunk(int(x[first]) >> CHUNKSHIFT, int(y[first]) >> CHUNKSHIFT)
+                types = np.zeros(CHUNKSIZE * CHUNKSIZE, dtype=np.uint8)
+                chunkVariants = np.zeros(CHUNKSIZE * CHUNKSIZE, dtype=np.uint8)
+                types[cells[group]] = tIds[group]
+                chunkVariants[cells[group]] = variants[group]
+                tChunk.types = bytearray(types.tobytes())
+                tChunk.variants = bytearray(chunkVariants.tobytes())
+                tChunk.count = int(np.count_nonzero(types))
+                self.chunks[int(keys[first])] = tChunk
+
+            for tileX, tileY, tId, variant in zip(x.tolist(), y.tolist(), tIds.tolist(), variants.tolist()):
+                self.indexTile(tId, variant, tileX, tileY)
+
+        self.offGridT = offGridIndex()
+        names = level.typeNames
+        for x, y, t, variant in zip(level.offX.tolist(), level.offY.tolist(), level.offType.tolist(), level.offVariant.tolist()):
+            self.addOffGrid({'type': names[t], 'variant': variant, 'pos': [x, y]}, sizeOffGrid)
+
+    # sizeOffGrid=False loads the level without touching any images so it
+    # can be done on another thread. sizeOffGrid() has to be called on
+    # the main thread before the map is used
+    def load(self,path, sizeOffGrid=True):
+        # .lvl files are in the packed binary format
+        if path.endswith('.lvl'):
+            self.loadLevel(levelFormat.load(path), sizeOffGrid)
+            return
         # open file in path and read it in
         # 'r' stands for read
         f = open(path, 'r')
@@ -84,9 +474,24 @@ class tilemap:
         # stores map data
         mapData = json.load(f)
         f.close()
-        self.tilemap = mapData['tilemap']
+        # the level files are keyed by 'x;y' strings so each tile
+        # is moved into the chunk it belongs to
+        self.chunks = {}
+        self.kindIndex = {}
+        for tile in mapData['tilemap'].values():
+            self.setTile(int(tile['pos'][0]), int(tile['pos'][1]), tile['type'], tile['variant'])
         #self.tileSize = mapData['tileSize']
-        self.offGridT = mapData['offgrid']
+        self.offGridT = offGridIndex()
+        for tile in mapData['offgrid']:
+            self.addOffGrid(tile, sizeOffGrid)
+
+    # puts the off grid tiles back into the index with the size of their
+    # images, in the same order so they are still drawn in that order
+    def sizeOffGrid(self):
+        tiles = [self.offGridT.tiles[tileId] for tileId in sorted(self.offGridT.tiles)]
+        self.offGridT = offGridIndex()
+        for tile in tiles:
+            self.addOffGrid(tile)
 
     # this method returns a bool 
     # if there is a surface tile at the position passed into the 
@@ -94,46 +499,90 @@ class tilemap:
     def surfCheck(self, pos):
         # gives the converted tile location based on the passed in 
         # tile position
-        tileLoc = str(int(pos[0]// self.tileSize)) + ';' + str(int(pos[1] //self.tileSize))
+        x = int(pos[0] // self.tileSize)
+        y = int(pos[1] // self.tileSize)
+        tChunk = self.chunks.get(((x >> CHUNKSHIFT) << CHUNKKEYSHIFT) + (y >> CHUNKSHIFT))
         # if this tile exist and is a tile with physics return the 
         # tile
-        if tileLoc in self.tilemap:
-            if self.tilemap[tileLoc]['type'] in physicTiles:
-                return self.tilemap[tileLoc]
+        if tChunk is not None and self.solidIds[tChunk.types[((y & CHUNKMASK) << CHUNKSHIFT) | (x & CHUNKMASK)]]:
+            return self.getTile(x, y)
             
-    # this method will check every single tile in the tilemap
-    # and the tile's surrounding. if the the surrounding tile is 
-    # the same variant then will proceed to checking which variant 
-    # of that tile it should be changed to through checking with the 
-    # autoTileMap container
+    # copies the solid cells of every chunk into one numpy grid
+    def buildSolidGrid(self):
+        if not self.chunks:
+            self.solidGrid = np.zeros((0, 0), dtype=bool)
+            self.solidOrigin = (0, 0)
+            return
+        left = min(tChunk.cx for tChunk in self.chunks.values())
+        top = min(tChunk.cy for tChunk in self.chunks.values())
+        right = max(tChunk.cx for tChunk in self.chunks.values()) + 1
+        bottom = max(tChunk.cy for tChunk in self.chunks.values()) + 1
+        grid = np.zeros(((bottom - top) * CHUNKSIZE, (right - left) * CHUNKSIZE), dtype=bool)
+        solidIds = np.frombuffer(self.solidIds, dtype=np.uint8).astype(bool)
+        for tChunk in self.chunks.values():
+            types = np.frombuffer(tChunk.types, dtype=np.uint8).reshape(CHUNKSIZE, CHUNKSIZE)
+            y = (tChunk.cy - top) * CHUNKSIZE
+            x = (tChunk.cx - left) * CHUNKSIZE
+            grid[y:y + CHUNKSIZE, x:x + CHUNKSIZE] = solidIds[types]
+        self.solidGrid = grid
+        self.solidOrigin = (left * CHUNKSIZE, top * CHUNKSIZE)
+
+    # surfCheck for a whole numpy array of (x, y) pixal positions at once.
+    # returns a numpy array of bools, True where the position is in a solid tile
+    def solidAtMany(self, points):
+        if self.solidGrid is None:
+            self.buildSolidGrid()
+        tileX = np.floor(points[:, 0] / self.tileSize).astype(np.int64) - self.solidOrigin[0]
+        tileY = np.floor(points[:, 1] / self.tileSize).astype(np.int64) - self.solidOrigin[1]
+        inside = (tileX >= 0) & (tileX < self.solidGrid.shape[1]) & (tileY >= 0) & (tileY < self.solidGrid.shape[0])
+        solid = np.zeros(len(points), dtype=bool)
+        solid[inside] = self.solidGrid[tileY[inside], tileX[inside]]
+        return solid
+
+    # this method looks at the 4 tiles next to the tile at (x, y).
+    # every neighbor with the same type as the tile adds its bit to the
+    # neighbor mask, then the mask is looked up in the autoTileMap to
+    # find which variant of the tile it should be changed to.
+    # returns True if the variant of the tile changed
+    def autoTileCell(self, x, y):
+        tChunk = self.chunks.get(chunkKey(x >> CHUNKSHIFT, y >> CHUNKSHIFT))
+        if tChunk is None:
+            return False
+        i = ((y & CHUNKMASK) << CHUNKSHIFT) | (x & CHUNKMASK)
+        tId = tChunk.types[i]
+        # skips empty cells and tiles that are not one of the
+        # auto tile types
+        if not self.autoTileIds[tId]:
+            return False
+        mask = 0
+        for shift, bit in autoTileBits:
+            if self.tileTypeAt(x + shift[0], y + shift[1]) == tId:
+                mask |= bit
+        variant = autoTileMap[mask]
+        # if the tile at hand is in the correct position in the
+        # auto tile map.
+        # set to the specific tile variant depending on where the
+        # neighboring tiles is in respect to the tile posiiton at hand
+        if variant == -1 or tChunk.variants[i] == variant:
+            return False
+        self.unindexTile(tId, tChunk.variants[i], x, y)
+        self.indexTile(tId, variant, x, y)
+        tChunk.variants[i] = variant
+        tChunk.dirty = True
+        return True
+
+    # placing or deleting a tile can only change the variant of that
+    # tile and the 4 tiles touching it so only those are auto tiled again
+    def autoTileAround(self, x, y):
+        self.autoTileCell(x, y)
+        for shift, bit in autoTileBits:
+            self.autoTileCell(x + shift[0], y + shift[1])
+
+    # this method will auto tile every single tile in the tilemap
     def autoTile(self):
-        # checks if the location of the tile exist
-        for loc in self.tilemap:
-            # stores the position on the location of the tile
-            tile = self.tilemap[loc]
-            neighborSet = set()
-            # looks at surround positions to the tile
-            for shift in [(1,0), (-1,0), (0,-1), (0,1)]:
-                # stores the surrounding position
-                checkLocation = str(tile['pos'][0] + shift[0]) + ';' + str(tile['pos'][1] + shift[1])
-                # checks if surrounding position has a tile there 
-                if checkLocation in self.tilemap:
-                    # if the surround tile has the same variant 
-                    # as the tile being looked at hand 
-                    # put that surrounding tile's coordinate into the 
-                    # neighbor set
-                    if self.tilemap[checkLocation]['type'] == tile['type']:
-                        neighborSet.add(shift)
-
-            # sort the coordinate in order
-            neighborSet = tuple(sorted(neighborSet))
-            # if the tile at hand is one of the auto tile type 
-            # and the tile at hand is in the correct position in the 
-            # auto tile map. 
-            # set to the specific tile variant depending on where the 
-            # neighboring tiles is in respect to the tile posiiton at hand
-            if (tile['type'] in autoTileType) and (neighborSet in autoTileMap):
-                tile['variant'] = autoTileMap[neighborSet]
+        for x, y, tId, variant in list(self.tiles()):
+            self.autoTileCell(x, y)
+
     # this function returns all of the tiles that are around the player
     def tilesAround(self, pos):
         tile = []
@@ -144,63 +593,164 @@ class tilemap:
         tileLoc = [int(pos[0]//self.tileSize), int(pos[1]//self.tileSize)]
 
         for offset in neighborOffSet:
-
             #checks the surround pixal that was passed in using the
             # neighborOffSet array so 9 pixals
-            # checkLoc is a string because 
-            # self.tilemap's index is a string
-            # ex) self.tilemap['10;5]
-            checkLoc = str(tileLoc[0]+offset[0]) + ';' + str(tileLoc[1]+offset[1])
             #if the pixal that is being checked exists in the tilemap object
             # as in the pixal is not just empty space
-            # then add the checked pixal to the tile list
-            if checkLoc in self.tilemap:
-                tile.append(checkLoc)
+            # then add the checked tile to the tile list
+            checkTile = self.getTile(tileLoc[0] + offset[0], tileLoc[1] + offset[1])
+            if checkTile:
+                tile.append(checkTile)
 
         return tile
-    # this function returns all of the tiles near the player 
-    # that need collision physics
-    def physicsRectAround(self, pos):
-        rect = []
-        
-        #this checks the coordinates of every single tile that is
-        # near to the player. tTiles then stores the tile type of
-        # each of the tiles at the coordinates stored in tTilekey
-        # if the type stored in tTiles is one that needs collision
-        # add a rectangle object at that coordinate for collision
-        for tTilekey in self.tilesAround(pos):
-            tTiles = self.tilemap[tTilekey]
-            if tTiles['type'] in physicTiles:
-                rect.append(pygame.Rect(tTiles['pos'][0]*self.tileSize, tTiles['pos'][1]*self.tileSize,self.tileSize,self.tileSize))
-        return rect
+    # this function returns the rects of every tile with collision
+    # physics that the pygame.Rect overlaps. every cell under the whole
+    # rect is checked so tall or wide entities don't miss tiles that are
+    # more than one tile away from their top left corner.
+    # the rects come from self.rectPool and the list returned is
+    # self.physicsHits so both are only good until the next call
+    def physicsRectsIn(self, rect):
+        hits = self.physicsHits
+        hits.clear()
+        pool = self.rectPool
+        tileSize = self.tileSize
+        for y in range(rect.top // tileSize, (rect.bottom - 1) // tileSize + 1):
+            for x in range(rect.left // tileSize, (rect.right - 1) // tileSize + 1):
+                tChunk = self.chunks.get(((x >> CHUNKSHIFT) << CHUNKKEYSHIFT) + (y >> CHUNKSHIFT))
+                if tChunk is not None and self.solidIds[tChunk.types[((y & CHUNKMASK) << CHUNKSHIFT) | (x & CHUNKMASK)]]:
+                    # the pool only grows if an entity is bigger than any before it
+                    if len(hits) == len(pool):
+                        pool.append(pygame.Rect(0, 0, tileSize, tileSize))
+                    tileRect = pool[len(hits)]
+                    tileRect.x = x * tileSize
+                    tileRect.y = y * tileSize
+                    hits.append(tileRect)
+        return hits
+
+    # moves a box that is size big from pos by (dx, dy) through the map and
+    # finds the first solid tile it runs into on the way (swept AABB).
+    # returns how far along the movement the box got before touching the
+    # tile (0 to 1, 1 means it didn't hit anything) and the normal of the
+    # side of the tile that was hit, like (-1, 0) for the left side.
+    # since the whole path is checked a fast being can't skip over a
+    # thin wall between two frames (tunnelling).
+    # a box that already starts inside a tile (a bad spawn or a tile
+    # placed on top of it) hits that tile too. the time is negative then,
+    # and moving by it puts the box back against the side of the tile it
+    # came in from, the same as the old move then push out collision
+    def sweep(self, pos, size, dx, dy):
+        # a box that isn't moving can't run into anything
+        if not (dx or dy):
+            return 1.0, (0, 0)
+        x, y = pos
+        w, h = size
+        # every solid tile under the area the box passes through
+        left = math.floor(x + dx if dx < 0 else x)
+        top = math.floor(y + dy if dy < 0 else y)
+        right = math.ceil((x if dx < 0 else x + dx) + w)
+        bottom = math.ceil((y if dy < 0 else y + dy) + h)
+        area = self.sweepRect
+        area.update(left, top, right - left, bottom - top)
+
+        toi = 1.0
+        normal = (0, 0)
+        for tile in self.physicsRectsIn(area):
+            # the times the box starts and stops overlapping the tile on
+            # each axis. if the box isn't moving on an axis it has to
+            # already be overlapping the tile on that axis to hit it
+            if dx > 0:
+                xEntry = (tile.left - x - w) / dx
+                xExit = (tile.right - x) / dx
+            elif dx < 0:
+                xEntry = (tile.right - x) / dx
+                xExit = (tile.left - x - w) / dx
+            elif x + w <= tile.left or x >= tile.right:
+                continue
+            else:
+                xEntry = -math.inf
+                xExit = math.inf
+
+            if dy > 0:
+                yEntry = (tile.top - y - h) / dy
+                yExit = (tile.bottom - y) / dy
+            elif dy < 0:
+                yEntry = (tile.bottom - y) / dy
+                yExit = (tile.top - y - h) / dy
+            elif y + h <= tile.top or y >= tile.bottom:
+                continue
+            else:
+                yEntry = -math.inf
+                yExit = math.inf
+
+            # the box is only touching the tile while it overlaps on both
+            # axes. tiles that are behind the box (it stops overlapping
+            # them before the movement starts) can't be hit
+            entry = max(xEntry, yEntry)
+            exitTime = min(xExit, yExit)
+            if entry >= toi or entry >= exitTime or exitTime <= 0:
+                continue
+            toi = entry
+            if xEntry > yEntry:
+                normal = (-1 if dx > 0 else 1, 0)
+            else:
+                normal = (0, -1 if dy > 0 else 1)
+        return toi, normal
+
+    # draws every tile of the chunk onto the chunk's own surface.
+    # this only happens when a tile in the chunk has changed so the
+    # static terrain is not blitted tile by tile every frame
+    def bakeChunk(self, tChunk):
+        chunkPixals = CHUNKSIZE * self.tileSize
+        if tChunk.surf is None:
+            tChunk.surf = pygame.Surface((chunkPixals, chunkPixals))
+            # the tile images use black as their transparent colour
+            # so the empty parts of the chunk are left black as well
+            tChunk.surf.set_colorkey((0,0,0))
+        tChunk.surf.fill((0,0,0))
+        tChunk.overflow = []
+        baseX = (tChunk.cx << CHUNKSHIFT) * self.tileSize
+        baseY = (tChunk.cy << CHUNKSHIFT) * self.tileSize
+        for i in range(CHUNKSIZE * CHUNKSIZE):
+            tId = tChunk.types[i]
+            if tId:
+                img = self.game.assets[self.typeNames[tId]][tChunk.variants[i]]
+                cellX = (i & CHUNKMASK) * self.tileSize
+                cellY = (i >> CHUNKSHIFT) * self.tileSize
+                if img.get_width() > self.tileSize or img.get_height() > self.tileSize:
+                    # stores the pixal position in the world for render
+                    tChunk.overflow.append((img, baseX + cellX, baseY + cellY))
+                else:
+                    tChunk.surf.blit(img, (cellX, cellY))
+        tChunk.dirty = False
     
     def render(self,surf, offset=(0,0)):
 
-        for tile in self.offGridT:
-            # self.offGridT is a list so will be interpeted as a 
+        # only the off grid tiles that overlap the screen are drawn
+        for tile in self.offGridIn(pygame.Rect(offset[0], offset[1], surf.get_width(), surf.get_height())):
+            # the off grid tiles are positioned in
             # pixals not in the grid litterally in the name
             # so no need to multiply by tileSize
             surf.blit(self.game.assets[tile['type']][tile['variant']], (tile['pos'][0]- offset[0], tile['pos'][1]- offset[1]))
 
-        # this will check the screen starting from the top left (offset[0]//self.tileSize)
-        # to the top right (offset[0] + surf.get_width)//self.tileSize + 1)
-        # the plus one is there because this will be 1 tile off if not aded
-
-        # the nested for loop will check from top to bottom of the screen
-        for x in range(offset[0] // self.tileSize, (offset[0] + surf.get_width()) // self.tileSize +1):
-            for y in range(offset[1] // self.tileSize, (offset[1] + surf.get_height()) // self.tileSize + 1):
-                loc = str(x) + ';' + str(y)
-                if loc in self.tilemap:
-                    tile = self.tilemap[loc]
-                    # .blit([thing want to render], [location of render])
-                    # self.game.assets[] refers to the dictionary in main 
-                    # that contains all of the different types of tiles and
-                    # player assets
-                    # tile varible refers to the object created in this current for loop
-                    # use ['pos'] in tile['pos'] to navagate the dictionary created in the 
-                    # constructor in this tilemap Class
-                    # the postion contained two values which is why ther is an addition (())
-                    # tile['pos'] is multiplied by self.tileSize because the postion value is in
-                    # terms of the grid but we want the tile to be the size of the asset
-                    # to make pixal art
-                    surf.blit(self.game.assets[tile['type']][tile['variant']], (tile['pos'][0] * self.tileSize - offset[0], tile['pos'][1] * self.tileSize - offset[1]))           
\ No newline at end of file
+        chunkPixals = CHUNKSIZE * self.tileSize
+        overflow = []
+        # this will check the screen one chunk at a time starting from the top left
+        # chunk (offset[0] // chunkPixals) to the bottom right chunk of the screen.
+        # it starts one chunk further to the left and up because the tiles
+        # that are too big for a chunk surface hang over into the chunks
+        # to the right and below them
+        for cx in range(offset[0] // chunkPixals - 1, (offset[0] + surf.get_width()) // chunkPixals + 1):
+            for cy in range(offset[1] // chunkPixals - 1, (offset[1] + surf.get_height()) // chunkPixals + 1):
+                tChunk = self.chunks.get((cx << CHUNKKEYSHIFT) + cy)
+                if tChunk is None:
+                    continue
+                if tChunk.dirty:
+                    self.bakeChunk(tChunk)
+                # one blit for the whole chunk instead of one for every tile
+                surf.blit(tChunk.surf, (cx * chunkPixals - offset[0], cy * chunkPixals - offset[1]))
+                overflow.extend(tChunk.overflow)
+
+        # the big tiles are drawn after all of the chunks so the
+        # chunks next to them don't cover them up
+        for img, x, y in overflow:
+            surf.blit(img, (x - offset[0], y - offset[1]))
@@ -0,0 +1,63 @@
+import time
+
+# the tick rate the game was tuned for. every speed, gravity and timer
+# in the game is a number per tick at this rate. when the physics run at
+# a different rate each tick moves everything by step = TICKRATE * dt of
+# those ticks (0.5 at 120 ticks a second) so the game plays the same
+TICKRATE = 60
+
+# runs the game's physics at a fixed number of ticks per second no matter
+# how fast the screen is being drawn. the real time that passes between
+# frames is saved up in an accumulator and every time a full tick worth
+# of time is saved up one tick of physics is run. whatever time is left
+# over is returned by alpha() so the renderer can draw the beings part
+# of the way between where they were last tick and where they are now
+class FixedTimestep:
+    # rate is how many physics ticks run every second.
+    # maxCatchUp is the most ticks that are run for one frame. if the game
+    # falls further behind than that (like when the window is dragged) the
+    # rest of the time is thrown away instead of running hundreds of
+    # ticks to catch up which would make the game fall even further behind
+    def __init__(self, rate=TICKRATE, maxCatchUp=5):
+        self.maxCatchUp = maxCatchUp
+        self.accumulator = 0
+        self.lastTime = None
+        # counts how many times time had to be thrown away
+        self.dropped = 0
+        self.setRate(rate)
+
+    # changes how many physics ticks run every second
+    def setRate(self, rate):
+        self.rate = rate
+        self.dt = 1 / rate
+        # how many TICKRATE ticks one tick is worth
+        self.step = TICKRATE / rate
+        self.accumulator = 0
+
+    # starts counting time from now so time spent loading
+    # is not caught up on as soon as the game starts
+    def reset(self):
+        self.accumulator = 0
+        self.lastTime = time.perf_counter()
+
+    # adds the time since the last call and returns
+    # how many physics ticks should be run for this frame
+    def advance(self):
+        now = time.perf_counter()
+        if self.lastTime is None:
+            self.lastTime = now
+        self.accumulator += now - self.lastTime
+        self.lastTime = now
+
+        ticks = int(self.accumulator // self.dt)
+        if ticks > self.maxCatchUp:
+            ticks = self.maxCatchUp
+            self.accumulator = 0
+            self.dropped += 1
+        else:
+            self.accumulator -= ticks * self.dt
+        return ticks
+
+    # how far (0 to 1) the time is between the last tick and the next one
+    def alpha(self):
+        return min(1, self.accumulator / self.dt)
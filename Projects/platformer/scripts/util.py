@@ -1,51 +1,204 @@
+import json
+import threading
+import time
 import pygame
 #gives access to file explore
 import os
 
 imagePath = 'data/images/'
 
+# the packed atlas made by scripts/atlas.py. if it exists the images
+# are cut out of it instead of being loaded one file at a time
+atlasPath = 'data/atlas.png'
+manifestPath = 'data/atlas.json'
+# set to False to always load the images one file at a time
+useAtlas = True
+# the atlas image and the rects of every image in it
+# these are loaded the first time an image is asked for
+atlas = None
+atlasFolders = None
+
+# the game trusts the atlas and doesn't look at data/images when it
+# starts. python -m scripts.atlas --check and the level editor check
+# that the atlas still matches the images
+def loadAtlas():
+    global atlas, atlasFolders
+    if atlasFolders is None:
+        atlasFolders = {}
+        if useAtlas and os.path.exists(manifestPath):
+            with open(manifestPath) as f:
+                atlasFolders = json.load(f)['folders']
+            # one load and one .convert() for every image in the game
+            atlas = pygame.image.load(atlasPath).convert()
+            atlas.set_colorkey((0,0,0))
+    return atlasFolders
+
+# returns the image from the atlas or None if it is not in there.
+# the image is a subsurface so it shares its pixels with the atlas
+# and it has the same colorkey
+def atlasImage(path):
+    folder, name = os.path.split(path)
+    rect = loadAtlas().get(folder, {}).get(name)
+    if rect is None:
+        return None
+    return atlas.subsurface(rect)
+
 def loadImage(path):
+    img = atlasImage(path)
+    if img is not None:
+        return img
     # .convert() optimizes the image for faster performance
     img = pygame.image.load(imagePath + path).convert()
     img.set_colorkey((0,0,0))
     return img
 
 def loadImages(path):
+    path = path.rstrip('/')
+    frames = loadAtlas().get(path)
+    if frames is not None:
+        return [atlas.subsurface(frames[imgName]) for imgName in sorted(frames)]
+
     images = []
 
     # goes through all of the files based on the directory passed
-    # into the function
-    for imgName in os.listdir(imagePath + path):
+    # into the function. the names are sorted so the images are always
+    # in the same order (os.listdir does not sort them on every system)
+    for imgName in sorted(os.listdir(imagePath + path)):
         #addes each image to images list
         images.append(loadImage(path + '/' +imgName))
 
     return images
 
+# an animation clip. the clip is made once when the assets are loaded
+# and shared by every being and particle that plays it, so it is never
+# changed after it is made. the total length in frames is worked out
+# here once instead of on every update
 class animation():
     def __init__(self, images, imgDur=5, loop=True):
-        self.images = images
+        self.images = tuple(images)
         self.imgDur = imgDur
         self.loop = loop
+        self.length = imgDur * len(self.images)
+
+    # makes a new cursor that plays this clip from the start
+    def copy(self):
+        return animationCursor(self)
+
+# where a being is in the clip it is playing. each being keeps one cursor
+# and play() points it at a new clip when the action changes, so changing
+# the animation does not make any new objects
+class animationCursor():
+    __slots__ = ('clip', 'frame', 'done')
 
+    def __init__(self, clip=None):
+        self.clip = clip
+        # self.frame refers to frame of the game
+        self.frame = 0
         # checks if animation is finished
         self.done = False
+
+    # starts playing clip from its first frame
+    def play(self, clip):
+        self.clip = clip
         self.frame = 0
-    
-    # copying animations to be used in many instances
-    # will conserve memory since self.images is passed by reference
-    # so there are not many copies of self.image list/array
-    def copy(self):
-        return animation(self.images, self.imgDur,self.loop)
-    
-    def update(self):
-        if self.loop:
-            self.frame = (self.frame + 1) % (self.imgDur * len(self.images))
+        self.done = False
+
+    # moves the animation forward by step frames (less than one frame
+    # when the physics run faster than TICKRATE)
+    def update(self, step=1):
+        clip = self.clip
+        if clip.loop:
+            self.frame = (self.frame + step) % clip.length
         else:
-            self.frame = min(self.frame+1, self.imgDur * len(self.images) -1)
-            if self.frame >= self.imgDur * len(self.images)-1:
+            self.frame = min(self.frame + step, clip.length - 1)
+            if self.frame >= clip.length - 1:
                 self.done = True
-    
+
     def img(self):
-        # self.frame refers to frame of the game
-        return self.images[int(self.frame/self.imgDur)]
-    
\ No newline at end of file
+        return self.clip.images[int(self.frame // self.clip.imgDur)]
+
+# this is used in place of the dictionary of assets in the game. each
+# asset group is given a function that loads it and the group is only
+# loaded the first time it is used (or when preload is called with it)
+# so images a level never uses are never loaded.
+# it works like a dictionary so assets['grass'][0] still works
+class AssetRegistry:
+    def __init__(self, loaders=None):
+        # name -> function that loads the asset group. copied so two
+        # registries never share one dictionary
+        self.loaders = dict(loaders or {})
+        # name -> asset group for the groups that are loaded
+        self.loaded = {}
+        # how long each group took to load in milliseconds
+        self.timings = {}
+        # (being type, action) -> animation clip so beings do not have
+        # to build the 'type/action' name every time their action changes
+        self.clips = {}
+        # only one thread at a time is allowed to load a group
+        self.lock = threading.Lock()
+
+    def register(self, name, loader):
+        self.loaders[name] = loader
+        self.loaded.pop(name, None)
+        self.clips.clear()
+
+    def load(self, name):
+        with self.lock:
+            # another thread may have loaded it while this one was waiting
+            asset = self.loaded.get(name)
+            if asset is None:
+                start = time.perf_counter()
+                asset = self.loaders[name]()
+                self.timings[name] = (time.perf_counter() - start) * 1000
+                self.loaded[name] = asset
+        return asset
+
+    # loads the groups in names that are not loaded yet. names that
+    # are not assets (like spawners in the game) are skipped
+    def preload(self, names):
+        for name in names:
+            if name in self.loaders and name not in self.loaded:
+                self.load(name)
+
+    # returns the animation clip for the action of a being type
+    # ('player', 'run') is the clip of the 'player/run' group
+    def clip(self, btype, action):
+        key = (btype, action)
+        clip = self.clips.get(key)
+        if clip is None:
+            clip = self[btype + '/' + action]
+            self.clips[key] = clip
+        return clip
+
+    # prints how long each loaded group took, slowest first
+    def report(self):
+        for name, ms in sorted(self.timings.items(), key=lambda item: -item[1]):
+            print('%-20s %.2f ms' % (name, ms))
+        print('%d of %d groups loaded in %.2f ms' % (len(self.loaded), len(self.loaders), sum(self.timings.values())))
+
+    def __getitem__(self, name):
+        asset = self.loaded.get(name)
+        if asset is None:
+            asset = self.load(name)
+        return asset
+
+    def __setitem__(self, name, asset):
+        self.register(name, lambda: asset)
+        self.loaded[name] = asset
+
+    def __contains__(self, name):
+        return name in self.loaders
+
+    def __iter__(self):
+        return iter(self.loaders)
+
+    def __len__(self):
+        return len(self.loaders)
+
+    def keys(self):
+        return self.loaders.keys()
+
+    def get(self, name, default=None):
+        if name in self.loaders:
+            return self[name]
+        return default
@@ -0,0 +1,3 @@
+# Modules used by both the RogueLike and the platformer. Each game puts the Projects folder on
+# sys.path (RogueLike/sharedPath.py, platformer/scripts/__init__.py) so they can be imported
+# as shared.<module> from the game's own folder.
@@ -0,0 +1,90 @@
+import pygame
+
+
+"""
+DirtyRects
+
+Description:
+    Tracks the parts of a low resolution display surface that changed since the last frame
+    so only those parts are redrawn, scaled up onto the window surface, and presented with
+    pygame.display.update(rects). Overlapping rects are merged before drawing so no pixel is
+    drawn twice, and when nothing was marked the frame does no drawing at all. Marking the
+    whole display (for example when the camera moves) falls back to a full redraw and flip.
+
+Public Methods:
+    - mark(rect)                Marks a rect of the display, in display pixels, as changed.
+    - markAll()                 Marks the whole display as changed.
+    - regions()                 Returns the merged rects that have to be redrawn this frame.
+    - present(regions)          Scales the redrawn regions onto the screen and updates only those.
+
+Usage:
+    - from shared.dirtyRects import DirtyRects
+    - dirty = DirtyRects(self.display, self.screen)
+    - dirty.mark(tileRect)
+    - if dirty: regions = dirty.regions(); (redraw each region); dirty.present(regions)
+"""
+
+class DirtyRects:
+    def __init__(self, display, screen):
+        self.display = display
+        self.screen = screen
+        self.bounds = display.get_rect()
+
+        # Screen pixels per display pixel on each axis.
+        self.scale = (screen.get_width() / display.get_width(), screen.get_height() / display.get_height())
+
+        self.rects = []
+
+        # The first frame has to draw everything.
+        self.full = True
+
+    # Args:
+    #   rect: The changed area in display pixels as a pygame.Rect or an (x, y, w, h) sequence.
+    def mark(self, rect):
+        if self.full:
+            return
+        rect = pygame.Rect(rect).clip(self.bounds)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    def markAll(self):
+        self.full = True
+        self.rects.clear()
+
+    # Returns:
+    #   A list of non-overlapping pygame.Rects covering everything marked since the last present().
+    def regions(self):
+        if self.full:
+            return [self.bounds.copy()]
+
+        merged = []
+        for rect in self.rects:
+            i = rect.collidelist(merged)
+            while i != -1:
+                rect = rect.union(merged.pop(i))
+                i = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
+    # Args:
+    #   regions: The rects returned by regions() after they have been redrawn on the display.
+    def present(self, regions):
+        if self.full:
+            pygame.transform.scale(self.display, self.screen.get_size(), self.screen)
+            pygame.display.update()
+        else:
+            sx, sy = self.scale
+            updated = []
+            for rect in regions:
+                # Rounding the edges rather than the size keeps neighbouring regions gap free on screen.
+                left, top = round(rect.left * sx), round(rect.top * sy)
+                screenRect = pygame.Rect(left, top, round(rect.right * sx) - left, round(rect.bottom * sy) - top)
+                self.screen.blit(pygame.transform.scale(self.display.subsurface(rect), screenRect.size), screenRect)
+                updated.append(screenRect)
+            pygame.display.update(updated)
+
+        self.rects.clear()
+        self.full = False
+
+    def __bool__(self):
+        return self.full or bool(self.rects)
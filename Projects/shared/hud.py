@@ -0,0 +1,186 @@
+import pygame
+from shared.hudText import HudText, HUD_FONT_SIZE
+
+
+"""
+Hud
+
+Description:
+    A retained mode HUD layer. Widgets keep the values they show and flag the HUD when a
+    value actually changes; the HUD then redraws every widget into one transparent overlay
+    surface sized to the area the widgets cover. Every frame the overlay is composited onto
+    the display with a single blit, so bars and counters that did not change cost nothing
+    to draw.
+
+Public Methods:
+    - add(widget)                   Adds a widget to the HUD and returns it.
+    - remove(widget)                Removes a widget from the HUD.
+    - render(surface)               Redraws the overlay if a widget changed and blits it.
+
+Usage:
+    - from shared.hud import Hud, HudBar
+    - self.hud = Hud()
+    - self.healthBar = self.hud.add(HudBar((10, 10), (100, 10)))
+    - self.healthBar.set(currentHealth, maxHealth)
+    - self.hud.render(self.display)
+"""
+
+class Hud:
+    def __init__(self):
+        self.widgets = []
+        self.overlay = None
+
+        # Top left corner of the overlay on the display.
+        self.pos = (0, 0)
+
+        self.dirty = True
+
+    def add(self, widget):
+        widget.hud = self
+        self.widgets.append(widget)
+        self.dirty = True
+        return widget
+
+    def remove(self, widget):
+        self.widgets.remove(widget)
+        widget.hud = None
+        self.dirty = True
+
+    # Redraws every widget into the overlay, resizing it to the union of the widget rects.
+    def redraw(self):
+        self.dirty = False
+        if not self.widgets:
+            self.overlay = None
+            return
+
+        bounds = self.widgets[0].rect().unionall([widget.rect() for widget in self.widgets[1:]])
+        if self.overlay is None or self.overlay.get_size() != bounds.size:
+            self.overlay = pygame.Surface(bounds.size, pygame.SRCALPHA)
+
+        self.overlay.fill((0, 0, 0, 0))
+        self.pos = bounds.topleft
+        for widget in self.widgets:
+            widget.draw(self.overlay, (widget.pos[0] - bounds.x, widget.pos[1] - bounds.y))
+
+    # Args:
+    #   surface (pygame.Surface): The surface the HUD is drawn on, in screen space (no camera offset).
+    def render(self, surface):
+        if self.dirty:
+            self.redraw()
+        if self.overlay is not None:
+            surface.blit(self.overlay, self.pos)
+
+
+"""
+HudWidget
+
+Description:
+    Base class of the HUD widgets. A widget has a position on the display, reports its size,
+    draws itself onto the overlay, and calls changed() from set() only when its value differs
+    from the one it is already showing.
+
+Public Methods:
+    - rect()                        The area of the display the widget covers.
+    - draw(surface, pos)            Draws the widget onto the overlay at pos.
+"""
+
+class HudWidget:
+    def __init__(self, pos):
+        self.pos = pos
+        self.hud = None
+
+    def changed(self):
+        if self.hud is not None:
+            self.hud.dirty = True
+
+    def rect(self):
+        return pygame.Rect(self.pos, self.size())
+
+
+"""
+HudBar
+
+Description:
+    A bar that fills from the left, like the health bar: a border, a background, and a
+    foreground whose width is value / maximum of the inside of the bar.
+
+Public Methods:
+    - set(value, maximum)           Updates the filled part of the bar.
+"""
+
+class HudBar(HudWidget):
+    def __init__(self, pos, size, color=(0, 255, 0), back=(255, 0, 0), border=2, borderColor=(40, 40, 40)):
+        super().__init__(pos)
+        self.barSize = size
+        self.color = color
+        self.back = back
+        self.border = border
+        self.borderColor = borderColor
+
+        # Width in pixels of the filled part of the bar.
+        self.filled = size[0]
+
+    def set(self, value, maximum):
+        filled = max(0, min(self.barSize[0], int(self.barSize[0] * value / maximum)))
+        if filled != self.filled:
+            self.filled = filled
+            self.changed()
+
+    def size(self):
+        return (self.barSize[0] + self.border * 2, self.barSize[1] + self.border * 2)
+
+    def draw(self, surface, pos):
+        surface.fill(self.borderColor, pygame.Rect(pos, self.size()))
+
+        inside = pygame.Rect(pos[0] + self.border, pos[1] + self.border, self.barSize[0], self.barSize[1])
+        surface.fill(self.back, inside)
+        if self.filled:
+            inside.width = self.filled
+            surface.fill(self.color, inside)
+
+
+"""
+HudLabel
+
+Description:
+    A piece of text drawn through the glyph atlas cache in hudText.
+
+Public Methods:
+    - set(text)                     Updates the text.
+"""
+
+class HudLabel(HudWidget):
+    def __init__(self, pos, text='', size=HUD_FONT_SIZE, color=(255, 255, 255)):
+        super().__init__(pos)
+        self.text = HudText(size=size, color=color)
+        self.value = text
+
+    def set(self, text):
+        if text != self.value:
+            self.value = text
+            self.changed()
+
+    def size(self):
+        return self.text.render(self.value).get_size()
+
+    def draw(self, surface, pos):
+        surface.blit(self.text.render(self.value), pos)
+
+
+"""
+HudCounter
+
+Description:
+    A label showing numbers formatted into a template, like '{}/{}' for the health readout.
+
+Public Methods:
+    - set(*values)                  Updates the numbers.
+"""
+
+class HudCounter(HudLabel):
+    def __init__(self, pos, template='{}', size=HUD_FONT_SIZE, color=(255, 255, 255)):
+        super().__init__(pos, '', size, color)
+        self.template = template
+
+    def set(self, *values):
+        super().set(self.template.format(*values))
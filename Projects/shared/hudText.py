@@ -0,0 +1,132 @@
+import pygame
+
+# Characters pre-rendered into every glyph atlas. Numbers, separators and signs cover the HUD's counters.
+GLYPH_CHARACTERS = '0123456789/:.,-+%x '
+
+# Default font size of HUD text.
+HUD_FONT_SIZE = 20
+
+# (font name, size) -> pygame.font.Font. None is pygame's default font.
+fontCache = {}
+
+# (font name, size, color, antialias) -> GlyphAtlas.
+atlasCache = {}
+
+
+# Args:
+#   name (str): A font file path, or None for pygame's default font.
+#   size (int): The font size in points.
+# Returns:
+#   The shared pygame.font.Font. Constructing a Font reads and parses the font file, so it is only done once.
+def getFont(name=None, size=HUD_FONT_SIZE):
+    key = (name, size)
+    font = fontCache.get(key)
+    if font is None:
+        font = pygame.font.Font(name, size)
+        fontCache[key] = font
+    return font
+
+
+# Returns:
+#   The shared GlyphAtlas for a font, size and color.
+def getAtlas(name=None, size=HUD_FONT_SIZE, color=(255, 255, 255), antialias=True):
+    key = (name, size, tuple(color), antialias)
+    atlas = atlasCache.get(key)
+    if atlas is None:
+        atlas = GlyphAtlas(getFont(name, size), color, antialias)
+        atlasCache[key] = atlas
+    return atlas
+
+
+"""
+GlyphAtlas
+
+Description:
+    Renders the characters in GLYPH_CHARACTERS once into a single surface and remembers the
+    area of each one. Text made only of those characters (health, score and wave counters)
+    is composed by blitting areas of the atlas instead of asking the font to rasterise the
+    whole string again. Text with any other character falls back to font.render.
+
+Public Methods:
+    - compose(text)                 Returns a new surface with the text drawn on it.
+
+Usage:
+    - atlas = getAtlas(None, 20)
+    - surf = atlas.compose('75/100')
+"""
+
+class GlyphAtlas:
+    def __init__(self, font, color, antialias=True, characters=GLYPH_CHARACTERS):
+        self.font = font
+        self.color = color
+        self.antialias = antialias
+        glyphs = [font.render(char, antialias, color) for char in characters]
+        self.height = max(glyph.get_height() for glyph in glyphs)
+        self.surface = pygame.Surface((sum(glyph.get_width() for glyph in glyphs), self.height), pygame.SRCALPHA)
+
+        # character -> area of the atlas surface holding its glyph.
+        self.areas = {}
+        x = 0
+        for char, glyph in zip(characters, glyphs):
+            self.surface.blit(glyph, (x, 0))
+            self.areas[char] = pygame.Rect(x, 0, glyph.get_width(), self.height)
+            x += glyph.get_width()
+
+    # Args:
+    #   text (str): The text to draw.
+    # Returns:
+    #   A new surface with the text. Blit it, don't draw on it, since HudText hands it out again.
+    def compose(self, text):
+        areas = self.areas
+        if not all(char in areas for char in text):
+            return self.font.render(text, self.antialias, self.color)
+
+        surf = pygame.Surface((sum(areas[char].width for char in text), self.height), pygame.SRCALPHA)
+        x = 0
+        for char in text:
+            area = areas[char]
+            surf.blit(self.surface, (x, 0), area)
+            x += area.width
+        return surf
+
+
+"""
+HudText
+
+Description:
+    One piece of HUD text, like the health readout. It keeps the surface of the last text it
+    rendered and only composes a new one from the glyph atlas when the text changes, so a
+    value that stays the same costs a string comparison per frame.
+
+Public Methods:
+    - render(text)                  Returns the surface for the text, cached while it is unchanged.
+
+Usage:
+    - from shared.hudText import HudText
+    - self.hpText = HudText()
+    - surface.blit(self.hpText.render(f"{hp}/{maxHp}"), pos)
+"""
+
+class HudText:
+    def __init__(self, name=None, size=HUD_FONT_SIZE, color=(255, 255, 255), antialias=True):
+        self.name = name
+        self.size = size
+        self.color = color
+        self.antialias = antialias
+
+        # The atlas is looked up on the first render so the text can be created before pygame.font is ready.
+        self.atlas = None
+        self.text = None
+        self.surface = None
+
+    # Args:
+    #   text (str): The text to show.
+    # Returns:
+    #   The surface with the text on it.
+    def render(self, text):
+        if text != self.text:
+            if self.atlas is None:
+                self.atlas = getAtlas(self.name, self.size, self.color, self.antialias)
+            self.text = text
+            self.surface = self.atlas.compose(text)
+        return self.surface
@@ -0,0 +1,181 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+# Identifies a binary level file and the version of its layout.
+LEVEL_MAGIC = b'LVL1'
+LEVEL_VERSION = 1
+
+# magic, version, tile size, number of type names, number of grid tiles, number of off-grid tiles.
+LEVEL_HEADER = struct.Struct('<4sHHHxxII')
+
+
+"""
+LevelData
+
+Description:
+    A level in the packed binary (.lvl) format both games load. Instead of a JSON
+    dictionary with one small dictionary per tile, the file holds a header, a table of tile
+    type names, and flat little-endian arrays:
+
+        header        magic 'LVL1', version, tile size, type count, grid count, off-grid count
+        type names    one length byte followed by the UTF-8 name, for each type
+        grid tiles    (8 byte aligned) int16 x[n], int16 y[n], int16 type[n], int16 variant[n]
+        off-grid      (8 byte aligned) float64 x[m], float64 y[m], int16 type[m], int16 variant[m]
+
+    Grid positions are in tiles and off-grid positions are in pixels. Types are indices into
+    the type name table. load() memory-maps the file and the arrays are memoryviews of the
+    mapping, so nothing is copied until the tiles are read. The module only uses the standard
+    library; the platformer wraps the views in numpy arrays, which doesn't copy them either.
+
+Public Methods:
+    - fromJson(mapData)                          Builds a LevelData from the dictionary stored in a JSON level.
+    - toJson(level)                              Builds the JSON level dictionary back from a LevelData.
+    - save(path, level)                          Writes a LevelData to a .lvl file.
+    - load(path)                                 Memory-maps a .lvl file and returns a LevelData viewing it.
+
+Usage:
+    - python ../shared/levelFormat.py Media/levels/0.json Media/levels/0.lvl    (and the other way around)
+    - from shared import levelFormat
+    - level = load('Media/levels/0.lvl')
+    - mapData = toJson(level)
+"""
+
+class LevelData:
+    def __init__(self, tileSize, typeNames, grid, offgrid):
+        self.tileSize = tileSize
+        self.typeNames = typeNames
+
+        # (x, y, type, variant) sequences for the grid tiles and the off-grid tiles.
+        self.gridX, self.gridY, self.gridType, self.gridVariant = grid
+        self.offX, self.offY, self.offType, self.offVariant = offgrid
+
+
+# Args:
+#   offset (int): A byte offset in the file.
+# Returns:
+#   The offset rounded up to the next multiple of 8 so the arrays start aligned.
+def align(offset):
+    return (offset + 7) // 8 * 8
+
+
+def fromJson(mapData):
+    typeNames = []
+    typeIndex = {}
+
+    tiles = list(mapData['tilemap'].values())
+    offgrid = mapData['offgrid']
+    for tile in tiles + offgrid:
+        if tile['type'] not in typeIndex:
+            typeIndex[tile['type']] = len(typeNames)
+            typeNames.append(tile['type'])
+
+    # array('h') raises OverflowError for positions that don't fit in int16.
+    grid = (array('h', [tile['pos'][0] for tile in tiles]),
+            array('h', [tile['pos'][1] for tile in tiles]),
+            array('h', [typeIndex[tile['type']] for tile in tiles]),
+            array('h', [tile['variant'] for tile in tiles]))
+    off = (array('d', [tile['pos'][0] for tile in offgrid]),
+           array('d', [tile['pos'][1] for tile in offgrid]),
+           array('h', [typeIndex[tile['type']] for tile in offgrid]),
+           array('h', [tile['variant'] for tile in offgrid]))
+    return LevelData(mapData.get('tileSize', 16), typeNames, grid, off)
+
+
+def toJson(level):
+    names = level.typeNames
+    tiles = {}
+    for x, y, t, variant in zip(level.gridX, level.gridY, level.gridType, level.gridVariant):
+        tiles[str(x) + ';' + str(y)] = {'type': names[t], 'variant': variant, 'pos': [x, y]}
+
+    offgrid = []
+    for x, y, t, variant in zip(level.offX, level.offY, level.offType, level.offVariant):
+        offgrid.append({'type': names[t], 'variant': variant, 'pos': [x, y]})
+
+    return {'tilemap': tiles, 'tileSize': level.tileSize, 'offgrid': offgrid}
+
+
+# Args:
+#   values: A sequence of numbers.
+#   typecode (str): The array typecode to pack them as ('h' or 'd').
+# Returns:
+#   The values as little-endian bytes.
+def packArray(values, typecode):
+    packed = array(typecode, values)
+    if sys.byteorder != 'little':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def save(path, level):
+    n = len(level.gridX)
+    m = len(level.offX)
+
+    data = bytearray(LEVEL_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, level.tileSize, len(level.typeNames), n, m))
+    for name in level.typeNames:
+        encoded = name.encode('utf-8')
+        data += bytes([len(encoded)]) + encoded
+
+    data += bytes(align(len(data)) - len(data))
+    for values in (level.gridX, level.gridY, level.gridType, level.gridVariant):
+        data += packArray(values, 'h')
+
+    data += bytes(align(len(data)) - len(data))
+    for values in (level.offX, level.offY):
+        data += packArray(values, 'd')
+    for values in (level.offType, level.offVariant):
+        data += packArray(values, 'h')
+
+    with open(path, 'wb') as file:
+        file.write(data)
+
+
+def load(path):
+    with open(path, 'rb') as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, tileSize, typeCount, n, m = LEVEL_HEADER.unpack_from(data, 0)
+    if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+        raise ValueError(path + ' is not a version ' + str(LEVEL_VERSION) + ' level file')
+
+    offset = LEVEL_HEADER.size
+    typeNames = []
+    for i in range(typeCount):
+        length = data[offset]
+        typeNames.append(data[offset + 1:offset + 1 + length].decode('utf-8'))
+        offset += 1 + length
+
+    view = memoryview(data)
+
+    # Reads the next count values of the given typecode. On little-endian machines this is a
+    # view straight into the mapped file; otherwise the values are copied and byte swapped.
+    def nextArray(typecode, count):
+        nonlocal offset
+        size = array(typecode).itemsize * count
+        if sys.byteorder == 'little':
+            values = view[offset:offset + size].cast(typecode)
+        else:
+            values = array(typecode, view[offset:offset + size].tobytes())
+            values.byteswap()
+        offset += size
+        return values
+
+    offset = align(offset)
+    grid = tuple(nextArray('h', n) for i in range(4))
+    offset = align(offset)
+    offX, offY = nextArray('d', m), nextArray('d', m)
+    offType, offVariant = nextArray('h', m), nextArray('h', m)
+    return LevelData(tileSize, typeNames, grid, (offX, offY, offType, offVariant))
+
+
+# Converts a level between JSON and the binary format depending on the file extensions.
+if __name__ == '__main__':
+    source, target = sys.argv[1], sys.argv[2]
+    if source.endswith('.lvl'):
+        with open(target, 'w') as file:
+            json.dump(toJson(load(source)), file)
+    else:
+        with open(source) as file:
+            save(target, fromJson(json.load(file)))
@@ -0,0 +1,126 @@
+import math
+
+# Width and height in pixels of one bucket of the grid. Two tiles, a bit larger than a character.
+SPATIAL_CELL_SIZE = 32
+
+
+"""
+SpatialHash
+
+Description:
+    A uniform grid broadphase for the characters that move around. Every frame each enemy
+    registers its rect in the cells it covers; a check then only looks at the characters in
+    the cells around the area it cares about instead of testing every enemy against every
+    hitbox. Cells are hashed by their (x, y) index so the grid has no bounds, and the lists
+    of emptied cells are reused between frames.
+
+Public Methods:
+    - clear()                           Removes every item, done at the start of each frame.
+    - insert(item, rect)                Registers item with an (x, y, w, h) rect.
+    - query(rect)                       Returns the items whose rect overlaps rect.
+    - queryRadius(pos, radius)          Returns the items whose rect is within radius of pos.
+
+Usage:
+    - from shared.spatialHash import SpatialHash
+    - grid = SpatialHash()
+    - grid.clear(); grid.insert(enemy, enemy.rect())
+    - for enemy in grid.query(hitbox): enemy.takeDamage(25)
+"""
+
+class SpatialHash:
+    def __init__(self, cellSize=SPATIAL_CELL_SIZE):
+        self.cellSize = cellSize
+
+        # (cell x, cell y) -> list of the items in that cell.
+        self.cells = {}
+
+        # item -> (left, top, right, bottom) of the rect it was inserted with.
+        self.boxes = {}
+
+        # Emptied cell lists kept so clear() doesn't reallocate them every frame.
+        self.spare = []
+
+    def clear(self):
+        for items in self.cells.values():
+            items.clear()
+            self.spare.append(items)
+        self.cells.clear()
+        self.boxes.clear()
+
+    # Args:
+    #   left, top, right, bottom: The edges of a box in pixels.
+    # Returns:
+    #   The first and last cell index covered on each axis as (x0, y0, x1, y1).
+    def cellRange(self, left, top, right, bottom):
+        size = self.cellSize
+        x0 = math.floor(left / size)
+        y0 = math.floor(top / size)
+
+        # The right and bottom edges are exclusive, so a box ending on a cell edge stays out of the next cell.
+        x1 = max(x0, math.ceil(right / size) - 1)
+        y1 = max(y0, math.ceil(bottom / size) - 1)
+        return x0, y0, x1, y1
+
+    # Args:
+    #   item: Any hashable object, usually a Character.
+    #   rect: The item's bounds as a pygame.Rect or an (x, y, w, h) sequence.
+    def insert(self, item, rect):
+        left, top, w, h = rect
+        box = (left, top, left + w, top + h)
+        self.boxes[item] = box
+
+        x0, y0, x1, y1 = self.cellRange(*box)
+        cells = self.cells
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                items = cells.get((x, y))
+                if items is None:
+                    items = self.spare.pop() if self.spare else []
+                    cells[(x, y)] = items
+                items.append(item)
+
+    # Args:
+    #   rect: The area to search as a pygame.Rect or an (x, y, w, h) sequence.
+    # Returns:
+    #   A list of the items whose rect overlaps the area.
+    def query(self, rect):
+        left, top, w, h = rect
+        right = left + w
+        bottom = top + h
+        x0, y0, x1, y1 = self.cellRange(left, top, right, bottom)
+
+        found = []
+        seen = set()
+        boxes = self.boxes
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                for item in self.cells.get((x, y), ()):
+                    if item in seen:
+                        continue
+                    seen.add(item)
+                    box = boxes[item]
+                    if box[0] < right and box[2] > left and box[1] < bottom and box[3] > top:
+                        found.append(item)
+        return found
+
+    # Args:
+    #   pos: The (x, y) centre of the search in pixels.
+    #   radius: The search distance in pixels.
+    # Returns:
+    #   A list of the items whose rect has a point within radius of pos.
+    def queryRadius(self, pos, radius):
+        x, y = pos
+        found = []
+        boxes = self.boxes
+        for item in self.query((x - radius, y - radius, radius * 2, radius * 2)):
+            left, top, right, bottom = boxes[item]
+
+            # Distance from pos to the closest point of the rect.
+            dx = x - min(max(x, left), right)
+            dy = y - min(max(y, top), bottom)
+            if dx * dx + dy * dy <= radius * radius:
+                found.append(item)
+        return found
+
+    def __len__(self):
+        return len(self.boxes)
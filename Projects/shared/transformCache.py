@@ -0,0 +1,90 @@
+from collections import OrderedDict
+import pygame
+
+# Default number of transformed surfaces kept before the least recently used one is dropped.
+TRANSFORM_CACHE_SIZE = 512
+
+# Angles are rounded to a multiple of this many degrees before being used as a cache key.
+TRANSFORM_ANGLE_STEP = 1
+
+
+"""
+TransformCache
+
+Description:
+    A least recently used cache of flipped and rotated surfaces. pygame.transform.flip and
+    pygame.transform.rotate allocate a new surface on every call even though the same sprite
+    is flipped or rotated the same way frame after frame. The cache keys each result by
+    (surface id, flip x, flip y, quantised angle) so every transform is only done once, and
+    counts hits and misses so its effectiveness can be checked.
+
+Public Methods:
+    - get(surf, flipX=False, flipY=False, angle=0)   Returns surf flipped and then rotated by angle degrees.
+    - flip(surf, flipX, flipY=False)                  Shortcut for a flip only.
+    - rotate(surf, angle)                             Shortcut for a rotation only.
+    - clear()                                         Drops every cached surface and resets the counters.
+
+Usage:
+    - from shared.transformCache import transforms
+    - surface.blit(transforms.flip(img, self.flip), pos)
+    - print(transforms.hits, transforms.misses)
+"""
+
+class TransformCache:
+    def __init__(self, maxSize=TRANSFORM_CACHE_SIZE, angleStep=TRANSFORM_ANGLE_STEP):
+        self.maxSize = maxSize
+        self.angleStep = angleStep
+
+        # (id(surface), flipX, flipY, angle) -> (surface, transformed surface).
+        # The source surface is kept alive by its entry so its id can't be reused by another surface.
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    # Args:
+    #   surf: The surface to transform.
+    #   flipX, flipY: Whether to mirror the surface horizontally / vertically.
+    #   angle: Counterclockwise rotation in degrees, applied after the flip.
+    # Returns:
+    #   The transformed surface. It is shared, so callers must only blit it, never draw on it.
+    def get(self, surf, flipX=False, flipY=False, angle=0):
+        angle = round(angle / self.angleStep) * self.angleStep % 360
+        if not (flipX or flipY or angle):
+            return surf
+
+        key = (id(surf), flipX, flipY, angle)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        img = surf
+        if flipX or flipY:
+            img = pygame.transform.flip(img, flipX, flipY)
+        if angle:
+            img = pygame.transform.rotate(img, angle)
+
+        self.entries[key] = (surf, img)
+
+        # Evict the least recently used surface once the cache is over capacity.
+        if len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+        return img
+
+    def flip(self, surf, flipX, flipY=False):
+        return self.get(surf, flipX, flipY)
+
+    def rotate(self, surf, angle):
+        return self.get(surf, angle=angle)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Shared instance used by every character in a game.
+transforms = TransformCache()